@@ -152,6 +152,7 @@ from PyQt5.QtWidgets import (
     QMessageBox, QComboBox, QSpinBox, QHBoxLayout, QDateTimeEdit
 )
 from PyQt5.QtCore import QDateTime
+from roi_mask import parse_roi, format_roi, ROI_HELP
 
 # RTSP URL patterns for supported camera brands
 RTSP_PATTERNS = {
@@ -165,15 +166,33 @@ RTSP_PATTERNS = {
     'Ezviz': 'rtsp://{username}:{password}@{ip}:{port}/h264_stream'
 }
 
+# Low-resolution substream of each brand, used for the grid and motion checks
+SUBSTREAM_PATTERNS = {
+    'Hikvision': 'rtsp://{username}:{password}@{ip}:{port}/ISAPI/Streaming/Channels/{channel}02',
+    'Dahua': 'rtsp://{username}:{password}@{ip}:{port}/cam/realmonitor?channel={channel}&subtype=1',
+    'Axis': 'rtsp://{username}:{password}@{ip}:{port}/axis-media/media.amp?resolution=640x360',
+    'TP-Link': 'rtsp://{username}:{password}@{ip}:{port}/stream2',
+    'Reolink': 'rtsp://{username}:{password}@{ip}:554/h264Preview_01_sub',
+    'Amcrest': 'rtsp://{username}:{password}@{ip}:{port}/cam/realmonitor?channel={channel}&subtype=1'
+}
+
 # Default RTSP port for each brand
 DEFAULT_PORTS = {brand: 554 for brand in RTSP_PATTERNS.keys()}
 
 
+def format_substream_url(brand, username, password, ip, port, channel=None):
+    """Substream URL for a known brand, or None; single cameras are channel 1"""
+    pattern = SUBSTREAM_PATTERNS.get(brand)
+    if pattern is None:
+        return None
+    return pattern.format(username=username, password=password, ip=ip, port=port, channel=channel or 1)
+
+
 class AddCameraDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Add Camera")
-        self.setFixedSize(500, 680)
+        self.setFixedSize(500, 750)
 
         # --- StyleSheet ---
         self.setStyleSheet("""
@@ -285,6 +304,13 @@ class AddCameraDialog(QDialog):
         layout.addWidget(self.channel_label)
         layout.addWidget(self.channel_input)
 
+        # Detection area (normalised polygons)
+        self.roi_input = QLineEdit()
+        self.roi_input.setPlaceholderText("0.2 0.1, 0.8 0.1, 0.8 0.9, 0.2 0.9")
+        self.roi_input.setToolTip(ROI_HELP)
+        layout.addWidget(QLabel("Detection Area (ROI):"))
+        layout.addWidget(self.roi_input)
+
         # Scan Button
         self.scan_button = QPushButton("Scan Network for Cameras")
         self.scan_button.clicked.connect(self.scan_network)
@@ -312,6 +338,14 @@ class AddCameraDialog(QDialog):
         self.channel_label.setVisible(show)
         self.channel_input.setVisible(show)
 
+    def accept(self):
+        try:
+            parse_roi(self.roi_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid ROI", f"{e}\n\n{ROI_HELP}")
+            return
+        super().accept()
+
     def scan_network(self):
         QMessageBox.information(self, "Network Scan",
             "This would scan your network for cameras.\n\n"
@@ -338,6 +372,7 @@ class AddCameraDialog(QDialog):
             port=port,
             channel=channel
         )
+        substream_url = format_substream_url(brand, username, password, ip, port, channel)
 
         return {
             'name': name,
@@ -349,7 +384,9 @@ class AddCameraDialog(QDialog):
             'channel': channel if self.type_combo.currentText() == "DVR/NVR System" else None,
             'location': location,
             'timestamp': timestamp,
-            'rtsp_url': rtsp_url
+            'rtsp_url': rtsp_url,
+            'substream_url': substream_url,
+            'roi': format_roi(parse_roi(self.roi_input.text()))
         }
 
 
@@ -2,17 +2,31 @@ import sys
 import os
 import cv2
 import csv
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLineEdit, QFileDialog, QMessageBox, QComboBox, QLabel
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+from capture_hub import get_hub
+
+CAMERA_CHECK_SECONDS = 5.0  # How long access_camera waits for the first frame
+CAMERA_POLL_MS = 100  # How often the pending camera check looks for a frame
 
 
 class AddPersonForm(QWidget):
     def __init__(self):
         super().__init__()
+        self.camera_stream = None
+        self.camera_ip = None
+        self.camera_deadline = 0.0
+        self.camera_timer = QTimer(self)
+        self.camera_timer.timeout.connect(self.check_camera)
         self.initUI()
 
+    def closeEvent(self, event):
+        self.release_camera()
+        event.accept()
+
     def initUI(self):
         self.setWindowTitle('Add Known Person')
         self.setGeometry(0, 0, 500, 400)  # Set a medium size for the window
@@ -148,13 +162,37 @@ class AddPersonForm(QWidget):
             QMessageBox.warning(self, "Error", "No camera selected.")
             return
 
-        cap = cv2.VideoCapture(selected_camera_ip)
-        if not cap.isOpened():
+        # Reuses the stream if the camera is already open elsewhere
+        self.release_camera()
+        self.camera_stream = get_hub().subscribe(selected_camera_ip)
+        self.camera_ip = selected_camera_ip
+        self.camera_deadline = time.monotonic() + CAMERA_CHECK_SECONDS
+        self.access_camera_button.setEnabled(False)
+        # Polled from the event loop so the window stays responsive while the camera connects
+        self.camera_timer.start(CAMERA_POLL_MS)
+
+    def check_camera(self):
+        """Finish a pending access_camera once a frame arrives or the wait times out."""
+        if self.camera_stream is None:
+            return
+        sequence, frame = self.camera_stream.latest()
+        if not sequence and time.monotonic() < self.camera_deadline:
+            return
+        self.release_camera()
+        if not sequence:
             QMessageBox.warning(self, "Error", "Unable to access the selected camera.")
             return
 
-        QMessageBox.information(self, "Success", f"Accessing camera: {selected_camera_ip}")
-        # You can add code here to capture frames from the camera and process them.
+        QMessageBox.information(self, "Success", f"Accessing camera: {self.camera_ip}")
+        # You can add code here to process the captured frame.
+
+    def release_camera(self):
+        """Stop any pending camera check and give the stream back to the hub."""
+        self.camera_timer.stop()
+        self.access_camera_button.setEnabled(True)
+        if self.camera_stream is not None:
+            self.camera_stream.stop()
+            self.camera_stream = None
 
 
 if __name__ == '__main__':
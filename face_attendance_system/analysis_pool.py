@@ -0,0 +1,236 @@
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+from frame_analyzer import FrameAnalyzer, RECORD_DTYPE
+from frame_context import FrameContext
+from utils.file_utils import load_limits
+
+SLOTS_PER_CAMERA = 2  # One frame being analysed, one waiting
+STOP = None
+
+
+def attach_shared_memory(name):
+    """Attach to a frame segment owned by the parent process.
+
+    Spawned workers share the parent's resource tracker, so the segment is
+    only unlinked by the parent, or by the tracker if the parent dies.
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(tasks, results):
+    """Analysis worker: owns the FrameAnalyzer of every camera routed to it."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(processName)s - %(levelname)s - %(message)s")
+    analyzers = {}
+    segments = {}
+    while True:
+        task = tasks.get()
+        if task is STOP:
+            break
+        kind, camera_id = task[0], task[1]
+        if kind == "camera":
+            analyzers[camera_id] = FrameAnalyzer(task[2])
+            continue
+        if kind == "reset":
+            if camera_id in analyzers:
+                analyzers[camera_id].reset()
+            continue
+        if kind == "remove":
+            analyzers.pop(camera_id, None)
+            # The parent has unlinked the camera's slots; drop our mapping too
+            segment = segments.pop(camera_id, None)
+            if segment is not None:
+                segment.close()
+            continue
+
+        _, _, sequence, name, slot, shape = task
+        segment = segments.get(camera_id)
+        if segment is None or segment.name != name:
+            if segment is not None:
+                segment.close()
+            segment = segments[camera_id] = attach_shared_memory(name)
+        frame_bytes = shape[0] * shape[1]
+        gray = np.ndarray(shape, np.uint8, segment.buf, offset=slot * frame_bytes)
+        records, summary, active = None, None, False
+        start = time.perf_counter()
+        analyzer = analyzers.get(camera_id)
+        if analyzer is not None:
+            try:
+                records = analyzer.analyze(FrameContext(gray)).tobytes()
+                summary, active = analyzer.quality.summary(), analyzer.active
+            except Exception as e:
+                logging.error(f"Analysis failed for camera {camera_id}: {e}")
+        del gray  # Release the view before the slot is handed back
+        results.put((camera_id, sequence, slot, name, records, summary, active, time.perf_counter() - start))
+
+    for segment in segments.values():
+        segment.close()
+
+
+class CameraSlots:
+    """Shared-memory ring of grayscale frame slots for one camera."""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.frame_bytes = shape[0] * shape[1]
+        self.memory = shared_memory.SharedMemory(create=True, size=SLOTS_PER_CAMERA * self.frame_bytes)
+        self.free = list(range(SLOTS_PER_CAMERA))
+
+    def view(self, slot):
+        return np.ndarray(self.shape, np.uint8, self.memory.buf, offset=slot * self.frame_bytes)
+
+    def release(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+class AnalysisPool:
+    """Runs face analysis for many cameras in worker processes.
+
+    Each camera is pinned to one worker, which keeps its tracker and
+    identity state, so cameras spread over cores and scale with them up to
+    the MAX_CAMERAS limit. Grayscale frames are written into per-camera
+    shared-memory slots and only the slot index crosses the process
+    boundary; results come back as packed ``frame_analyzer.RECORD_DTYPE``
+    records. ``submit`` never blocks: when all slots of a camera are busy
+    the frame is dropped, so analysis always works on recent frames.
+    """
+
+    def __init__(self, workers=None, max_cameras=None, scheduler=None):
+        if max_cameras is None:
+            max_cameras = int(load_limits().get("MAX_CAMERAS", 5))
+        self.max_cameras = max_cameras
+        self.scheduler = scheduler  # Told about every analysed frame
+        self.workers = max(1, min(workers or os.cpu_count() or 1, max_cameras))
+        # Spawned workers: forking a process that runs Qt and camera threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._results = context.Queue()
+        self._tasks = [context.Queue() for _ in range(self.workers)]
+        self._processes = [context.Process(target=_worker_main, args=(tasks, self._results),
+                                           name=f"analysis-{i}", daemon=True)
+                           for i, tasks in enumerate(self._tasks)]
+        for process in self._processes:
+            process.start()
+        self._lock = threading.Lock()
+        self._cameras = {}
+        self._slots = {}
+        self._retired = {}
+        self._latest = {}
+        self._summaries = {}
+        self._next_id = 0
+
+    def add_camera(self, camera_info):
+        """Register a camera and return its id, or None past the MAX_CAMERAS limit."""
+        with self._lock:
+            if len(self._cameras) >= self.max_cameras:
+                logging.warning(f"Camera limit of {self.max_cameras} reached, not analysing "
+                                f"{camera_info.get('name', camera_info.get('ip', ''))}")
+                return None
+            camera_id = self._next_id
+            self._next_id += 1
+            self._cameras[camera_id] = camera_id % self.workers
+            self._latest[camera_id] = (0, None)
+        self._tasks[self._cameras[camera_id]].put(("camera", camera_id, dict(camera_info)))
+        return camera_id
+
+    def remove_camera(self, camera_id):
+        with self._lock:
+            worker = self._cameras.pop(camera_id, None)
+            if worker is None:
+                return
+            self._latest.pop(camera_id, None)
+            self._summaries.pop(camera_id, None)
+            slots = self._slots.pop(camera_id, None)
+            if slots is not None:
+                self._retire(slots)
+        self._tasks[worker].put(("remove", camera_id))
+
+    def reset_camera(self, camera_id):
+        with self._lock:
+            worker = self._cameras.get(camera_id)
+            if worker is not None:
+                self._latest[camera_id] = (0, None)
+        if worker is not None:
+            self._tasks[worker].put(("reset", camera_id))
+
+    def submit(self, camera_id, sequence, frame):
+        """Queue a BGR or grayscale frame for analysis; returns False if it was dropped."""
+        shape = frame.shape[:2]
+        with self._lock:
+            worker = self._cameras.get(camera_id)
+            if worker is None:
+                return False
+            slots = self._slots.get(camera_id)
+            if slots is None or slots.shape != shape:
+                if slots is not None:
+                    self._retire(slots)
+                slots = self._slots[camera_id] = CameraSlots(shape)
+            if not slots.free:
+                return False
+            slot = slots.free.pop()
+        # Convert straight into the shared slot: no intermediate copy
+        if frame.ndim == 2:
+            slots.view(slot)[:] = frame
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=slots.view(slot))
+        self._tasks[worker].put(("frame", camera_id, sequence, slots.memory.name, slot, shape))
+        return True
+
+    def _retire(self, slots):
+        # Workers may still be reading; unlink once every slot has come back
+        if len(slots.free) == SLOTS_PER_CAMERA:
+            slots.release()
+        else:
+            self._retired[slots.memory.name] = slots
+
+    def poll(self):
+        """Collect finished results; call regularly from the consumer thread."""
+        while True:
+            try:
+                camera_id, sequence, slot, name, data, summary, active, seconds = self._results.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                slots = self._slots.get(camera_id)
+                if slots is not None and slots.memory.name == name:
+                    slots.free.append(slot)
+                elif name in self._retired:
+                    retired = self._retired[name]
+                    retired.free.append(slot)
+                    if len(retired.free) == SLOTS_PER_CAMERA:
+                        retired.release()
+                        del self._retired[name]
+                if data is not None and camera_id in self._latest:
+                    self._latest[camera_id] = (sequence, np.frombuffer(data, RECORD_DTYPE))
+                    self._summaries[camera_id] = summary
+            if data is not None and self.scheduler is not None:
+                self.scheduler.report(camera_id, active, seconds)
+
+    def latest(self, camera_id):
+        """Return ``(sequence, records)`` of the newest analysed frame of a camera."""
+        self.poll()
+        return self._latest.get(camera_id, (0, None))
+
+    def quality_summary(self, camera_id):
+        """Face quality counts reported by the worker analysing a camera."""
+        return self._summaries.get(camera_id)
+
+    def close(self):
+        for tasks in self._tasks:
+            tasks.put(STOP)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        with self._lock:
+            for slots in list(self._slots.values()) + list(self._retired.values()):
+                slots.release()
+            self._slots.clear()
+            self._retired.clear()
@@ -0,0 +1,139 @@
+import time
+import threading
+
+DEFAULT_ANALYSIS_FPS = 20.0  # Frames per second analysed across all cameras
+MAX_CAMERA_FPS = 15.0  # No camera is analysed faster than this
+MIN_CAMERA_FPS = 0.5  # Every camera keeps at least this rate
+ACTIVE_WEIGHT = 4.0  # Share multiplier for cameras with recent motion or faces
+HIDDEN_WEIGHT = 0.25  # Share multiplier for tiles that are not on screen
+ACTIVE_HOLD = 3.0  # Seconds a camera stays active after motion or faces
+RATE_SMOOTHING = 0.2  # Weight of the newest sample in the moving averages
+
+
+class CameraBudget:
+    def __init__(self, name):
+        self.name = name
+        self.visible = True
+        self.active_until = 0.0
+        self.next_due = 0.0
+        self.last_analysed = None
+        self.interval = None  # Moving average of the time between analysed frames
+        self.allowed = 0.0  # Rate granted by the scheduler
+        self.weight = 1.0
+
+
+class AnalysisScheduler:
+    """Shares one analysis budget between all open cameras.
+
+    The budget is ``total_fps`` frames per second, or, with ``cpu_percent``,
+    whatever rate keeps ``cores`` analysis processes at that load given the
+    measured time per frame. Each camera gets a share weighted up while it
+    has motion or faces and down while its tile is hidden; shares are
+    recomputed whenever a camera is added, so a new camera slows the others
+    down instead of overloading the machine.
+    """
+
+    def __init__(self, total_fps=DEFAULT_ANALYSIS_FPS, cpu_percent=None, cores=1):
+        self.total_fps = total_fps
+        self.cpu_percent = cpu_percent
+        self.cores = cores
+        self.frame_seconds = None  # Moving average of the analysis time per frame
+        self._cameras = {}
+        self._lock = threading.Lock()
+
+    def add_camera(self, camera_id, name=""):
+        with self._lock:
+            self._cameras[camera_id] = CameraBudget(name or str(camera_id))
+            self._allocate()
+
+    def remove_camera(self, camera_id):
+        with self._lock:
+            if self._cameras.pop(camera_id, None) is not None:
+                self._allocate()
+
+    def set_visible(self, camera_id, visible):
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is not None and camera.visible != visible:
+                camera.visible = visible
+                self._allocate()
+
+    def report(self, camera_id, active, seconds=None):
+        """Record the outcome of one analysed frame; this is what the measured rate counts.
+
+        ``active`` is True when the frame had motion or faces; ``seconds`` is
+        how long the analysis took, used for a CPU budget.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if seconds is not None:
+                self.frame_seconds = seconds if self.frame_seconds is None else \
+                    (1 - RATE_SMOOTHING) * self.frame_seconds + RATE_SMOOTHING * seconds
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                return
+            if camera.last_analysed is not None:
+                sample = now - camera.last_analysed
+                camera.interval = sample if camera.interval is None else \
+                    (1 - RATE_SMOOTHING) * camera.interval + RATE_SMOOTHING * sample
+            camera.last_analysed = now
+            if active:
+                camera.active_until = now + ACTIVE_HOLD
+            if self._weight(camera, now) != camera.weight or self.cpu_percent is not None:
+                self._allocate()
+
+    def should_analyse(self, camera_id):
+        """True if the camera may analyse a frame now; never blocks."""
+        now = time.monotonic()
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is None or now < camera.next_due:
+                return False
+            if self._weight(camera, now) != camera.weight:
+                self._allocate()  # The camera went quiet since the last allocation
+            interval = 1.0 / camera.allowed
+            # Catch up at most one interval, so an idle gap does not cause a burst
+            camera.next_due = max(camera.next_due, now - interval) + interval
+            return True
+
+    def budget(self):
+        """Total frames per second currently shared out."""
+        if self.cpu_percent is not None and self.frame_seconds:
+            return self.cpu_percent / 100.0 * self.cores / self.frame_seconds
+        return self.total_fps
+
+    def _weight(self, camera, now):
+        weight = ACTIVE_WEIGHT if camera.active_until > now else 1.0
+        return weight if camera.visible else weight * HIDDEN_WEIGHT
+
+    def _allocate(self):
+        if not self._cameras:
+            return
+        now = time.monotonic()
+        weights = {cid: self._weight(camera, now) for cid, camera in self._cameras.items()}
+        total_weight = sum(weights.values())
+        budget = self.budget()
+        for cid, camera in self._cameras.items():
+            camera.weight = weights[cid]
+            share = budget * weights[cid] / total_weight
+            camera.allowed = min(MAX_CAMERA_FPS, max(MIN_CAMERA_FPS, share))
+
+    def rates(self):
+        """``[(name, measured fps, allowed fps)]`` for every camera."""
+        now = time.monotonic()
+        with self._lock:
+            result = []
+            for camera in self._cameras.values():
+                rate = 0.0
+                if camera.interval:
+                    # A camera that stopped being analysed counts its idle time too
+                    rate = 1.0 / max(camera.interval, now - camera.last_analysed)
+                result.append((camera.name, rate, camera.allowed))
+            return result
+
+    def status_text(self):
+        rates = self.rates()
+        if not rates:
+            return ""
+        cameras = ", ".join(f"{name} {rate:.1f}/{allowed:.1f}" for name, rate, allowed in rates)
+        return f"Analysis {self.budget():.0f} fps budget: {cameras}"
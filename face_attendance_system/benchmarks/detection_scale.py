@@ -0,0 +1,91 @@
+"""Face detection latency against agreement with full-resolution detection.
+
+Frames are scaled to 1080p and detected at full resolution (the reference),
+then at 720p, 360p and the scale chosen automatically from --min-face.
+Agreement is the share of reference detections found again (IoU >= 0.5).
+The reference is the detector's own output, not ground truth, so this is
+not recall: faces missed at 1080p count against no row.
+
+Usage (from face_attendance_system/):
+    python benchmarks/detection_scale.py --source data/training_images --min-face 60
+"""
+import os
+import sys
+import time
+import argparse
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import ScaledDetector, create_backend, detection_scale
+from face_tracker import iou
+
+FRAME_SIZE = (1920, 1080)
+DETECT_WIDTHS = [("1080p", 1920), ("720p", 1280), ("360p", 640), ("auto", None)]
+MATCH_IOU = 0.5
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')
+
+
+def load_frames(source, limit):
+    """Up to ``limit`` grayscale 1080p frames from a video file or an image folder."""
+    frames = []
+    if os.path.isdir(source):
+        for root, _, files in sorted(os.walk(source)):
+            for name in sorted(files):
+                if len(frames) >= limit:
+                    return frames
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    image = cv2.imread(os.path.join(root, name), cv2.IMREAD_GRAYSCALE)
+                    if image is not None:
+                        frames.append(cv2.resize(image, FRAME_SIZE))
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), FRAME_SIZE))
+    cap.release()
+    return frames
+
+
+def matched(reference, boxes):
+    """Number of reference boxes overlapped by some detected box."""
+    return sum(any(iou(ref, box) >= MATCH_IOU for box in boxes) for ref in reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark downscaled face detection.")
+    parser.add_argument("--source", default="data/training_images", help="video file or image folder")
+    parser.add_argument("--frames", type=int, default=100, help="frames to benchmark")
+    parser.add_argument("--detector", default="haar", help="detector backend (haar, lbp, yunet)")
+    parser.add_argument("--min-face", type=int, default=60, help="smallest face of interest at 1080p")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print(f"No frames found in {args.source}")
+        return 1
+
+    backend = create_backend(args.detector)
+    reference = [ScaledDetector(backend, args.min_face, FRAME_SIZE[0]).detect(f) for f in frames]
+    total = sum(len(r) for r in reference)
+    print(f"{len(frames)} frames, {total} reference detections, min face {args.min_face}px")
+    print(f"{'resolution':<12}{'detect size':>14}{'ms/frame':>10}{'faces':>8}{'agreement':>11}")
+
+    for name, width in DETECT_WIDTHS:
+        detector = ScaledDetector(backend, args.min_face, width)
+        scale = detection_scale(FRAME_SIZE[0], args.min_face, width)
+        start = time.perf_counter()
+        results = [detector.detect(f) for f in frames]
+        ms = (time.perf_counter() - start) * 1000.0 / len(frames)
+        found = sum(matched(r, b) for r, b in zip(reference, results))
+        agreement = found / total if total else float("nan")
+        size = f"{round(FRAME_SIZE[0] * scale)}x{round(FRAME_SIZE[1] * scale)}"
+        print(f"{name:<12}{size:>14}{ms:>10.1f}{sum(len(b) for b in results):>8}{agreement:>11.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Frames per second and recall of each face detector backend.
+
+The labeled sample is a folder of images plus a ``labels.csv`` with one row
+per face: ``file,x,y,w,h`` (box in the original image's pixels). Every
+image is scaled to each --sizes resolution and run through every available
+backend. For each resolution the fastest backend reaching --min-recall is
+suggested for the camera.csv "Detector" column.
+
+Usage (from face_attendance_system/):
+    python benchmarks/detector_backends.py --sample data/detector_sample --sizes 1920x1080,1280x720
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+from collections import defaultdict
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import DETECTOR_BACKENDS, ScaledDetector, create_backend
+from face_tracker import iou
+
+LABELS_FILE = "labels.csv"
+MATCH_IOU = 0.5
+
+
+def load_sample(folder):
+    """Return [(gray image, [boxes])] from a labeled sample folder."""
+    boxes = defaultdict(list)
+    with open(os.path.join(folder, LABELS_FILE), newline="") as f:
+        for row in csv.DictReader(f):
+            boxes[row["file"]].append(tuple(float(row[k]) for k in ("x", "y", "w", "h")))
+
+    sample = []
+    for name, faces in sorted(boxes.items()):
+        image = cv2.imread(os.path.join(folder, name), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            print(f"Skipping unreadable {name}")
+            continue
+        sample.append((image, faces))
+    return sample
+
+
+def resize_sample(sample, size):
+    """Scale every image and its boxes to ``size`` (width, height)."""
+    resized = []
+    for image, faces in sample:
+        sx, sy = size[0] / image.shape[1], size[1] / image.shape[0]
+        resized.append((cv2.resize(image, size, interpolation=cv2.INTER_AREA),
+                        [(x * sx, y * sy, w * sx, h * sy) for x, y, w, h in faces]))
+    return resized
+
+
+def evaluate(detector, sample):
+    """Return (fps, recall, precision) of ``detector`` over ``sample``."""
+    found = detected = total = 0
+    start = time.perf_counter()
+    results = [detector.detect(image) for image, _ in sample]
+    elapsed = time.perf_counter() - start
+    for (_, faces), boxes in zip(sample, results):
+        total += len(faces)
+        detected += len(boxes)
+        found += sum(any(iou(face, box) >= MATCH_IOU for box in boxes) for face in faces)
+    fps = len(sample) / elapsed if elapsed > 0 else float("inf")
+    recall = found / total if total else 0.0
+    precision = found / detected if detected else 0.0
+    return fps, recall, precision
+
+
+def select_backend(results, min_recall):
+    """Fastest backend reaching ``min_recall``, else the one with the best recall."""
+    good = [r for r in results if r["recall"] >= min_recall]
+    if good:
+        return max(good, key=lambda r: r["fps"])["backend"]
+    return max(results, key=lambda r: r["recall"])["backend"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the face detector backends.")
+    parser.add_argument("--sample", default="data/detector_sample", help="labeled sample folder")
+    parser.add_argument("--sizes", default="1920x1080,1280x720,640x360", help="resolutions to test")
+    parser.add_argument("--min-face", type=int, default=30, help="smallest face of interest in pixels")
+    parser.add_argument("--min-recall", type=float, default=0.9, help="recall a suggested backend must reach")
+    args = parser.parse_args()
+
+    sample = load_sample(args.sample)
+    if not sample:
+        print(f"No labeled images found in {args.sample}")
+        return 1
+
+    backends = {}
+    for name in DETECTOR_BACKENDS:
+        try:
+            backends[name] = create_backend(name)
+        except (RuntimeError, FileNotFoundError, cv2.error) as e:
+            print(f"Skipping {name}: {e}")
+
+    faces = sum(len(f) for _, f in sample)
+    print(f"{len(sample)} images, {faces} labeled faces")
+    for size in args.sizes.split(","):
+        width, height = (int(v) for v in size.lower().split("x"))
+        scaled = resize_sample(sample, (width, height))
+        results = []
+        print(f"\n{size}")
+        print(f"{'backend':<10}{'fps':>8}{'recall':>9}{'precision':>11}")
+        for name, backend in backends.items():
+            # Full-resolution detection, so backends are compared on the same pixels
+            fps, recall, precision = evaluate(ScaledDetector(backend, args.min_face, width), scaled)
+            results.append({"backend": name, "fps": fps, "recall": recall})
+            print(f"{name:<10}{fps:>8.1f}{recall:>9.1%}{precision:>11.1%}")
+        if results:
+            print(f"Suggested detector at {size}: {select_backend(results, args.min_recall)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Frames per second per tile of the QLabel grid versus the video wall.
+
+Every tile gets a new tile-sized frame with two face boxes each round, as
+the render threads would deliver it, and the whole grid is repainted
+synchronously. The QLabel grid takes a pixmap per tile; the wall takes the
+images and boxes and composites them in one paint. The wall is the OpenGL
+one when a context can be created, else the software one (shown in the
+output). Set FACE_ATTENDANCE_SOFTWARE_GL=1 to measure Mesa's software
+OpenGL.
+
+Usage (from face_attendance_system/):
+    python benchmarks/video_wall.py --grids 2,3,4,5 --size 1280x720 --seconds 3
+"""
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_wall import create_video_wall, prefer_software_opengl, VideoWall
+from tile_renderer import RenderedTile
+from frame_context import FrameContext
+
+VARIANTS = 8  # Distinct frames cycled through, so nothing is served from a cache
+OVERLAYS = [(40, 30, 60, 60, "#1 ID:3"), (150, 50, 50, 50, None)]
+
+
+def parse_window(text):
+    width, height = (int(v) for v in text.lower().split("x"))
+    return width, height
+
+
+def make_frames(size):
+    """Tile-sized BGR frames derived from noisy ``size`` sources."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (size[1], size[0], 3), np.uint8) for _ in range(VARIANTS)]
+
+
+def label_grid(app, grid, window, frames, seconds):
+    from PyQt5.QtWidgets import QWidget, QGridLayout, QLabel
+    from PyQt5.QtGui import QPixmap
+    container = QWidget()
+    layout = QGridLayout(container)
+    layout.setSpacing(2)
+    labels = []
+    for i in range(grid * grid):
+        label = QLabel()
+        label.setMinimumSize(1, 1)
+        layout.addWidget(label, i // grid, i % grid)
+        labels.append(label)
+    container.resize(*window)
+    container.show()
+    app.processEvents()
+    tile = labels[0].size()
+    tiles = [FrameContext(f).display_bgr(tile.width(), tile.height()) for f in frames]
+
+    rounds, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for i, label in enumerate(labels):
+            image = tiles[(rounds + i) % VARIANTS].copy()
+            for x, y, w, h, text in OVERLAYS:
+                cv2.rectangle(image, (x, y), (x+w, y+h), (0, 255, 0), 2)
+            label.setPixmap(QPixmap.fromImage(RenderedTile(image).image))
+        container.repaint()
+        app.processEvents()
+        rounds += 1
+    container.close()
+    return rounds / (time.perf_counter() - start)
+
+
+def video_wall(app, grid, window, frames, seconds):
+    wall = create_video_wall()
+    wall.set_grid(grid, grid)
+    wall.resize(*window)
+    wall.show()
+    app.processEvents()
+    tile = wall.tile_rect(0).size()
+    tiles = [FrameContext(f).display_bgr(tile.width(), tile.height()) for f in frames]
+
+    rounds, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for i in range(grid * grid):
+            wall.set_tile(i, RenderedTile(tiles[(rounds + i) % VARIANTS]), OVERLAYS)
+        wall.repaint()
+        app.processEvents()
+        rounds += 1
+    kind = "opengl" if isinstance(wall, VideoWall) else "software"
+    wall.close()
+    return rounds / (time.perf_counter() - start), kind
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grids", default="2,3,4,5", help="grid sizes to measure, e.g. 2,3,4")
+    parser.add_argument("--size", default="1280x720", help="camera frame size")
+    parser.add_argument("--window", default="1280x960", help="grid area size")
+    parser.add_argument("--seconds", type=float, default=3.0, help="time per measurement")
+    args = parser.parse_args()
+
+    prefer_software_opengl()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    frames = make_frames(parse_window(args.size))
+    window = parse_window(args.window)
+
+    print(f"{'tiles':>5}  {'QLabel fps':>10}  {'wall fps':>8}  wall")
+    for grid in (int(g) for g in args.grids.split(",")):
+        labels = label_grid(app, grid, window, frames, args.seconds)
+        wall, kind = video_wall(app, grid, window, frames, args.seconds)
+        print(f"{grid * grid:>5}  {labels:>10.1f}  {wall:>8.1f}  {kind}")
+
+
+if __name__ == "__main__":
+    main()
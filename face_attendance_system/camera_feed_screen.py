@@ -2,6 +2,7 @@ import cv2
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import QTimer
 from face_recognition import detect_faces
+from capture_hub import get_hub
 from PyQt5.QtGui import *
 class CameraFeedScreen(QWidget):
     def __init__(self, camera_name):
@@ -12,20 +13,21 @@ class CameraFeedScreen(QWidget):
         self.layout.addWidget(self.video_label)
         self.setLayout(self.layout)
 
-        self.cap = cv2.VideoCapture(0)  # Default Camera
+        self.stream = get_hub().subscribe(0, camera_name)  # Default Camera
+        self.last_sequence = 0
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)
 
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if ret:
-            frame = detect_faces(frame)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        sequence, frame = self.stream.latest()
+        if sequence != self.last_sequence:
+            self.last_sequence = sequence
+            frame = detect_faces(frame.copy())
             height, width, channel = frame.shape
             bytes_per_line = channel * width
-            image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
+            image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_BGR888)
             self.video_label.setPixmap(QPixmap.fromImage(image))
 
     def closeEvent(self, event):
-        self.cap.release()
+        self.stream.stop()
@@ -0,0 +1,207 @@
+import time
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from frame_grabber import FrameGrabber
+
+DEFAULT_PORTS = {"rtsp": 554, "http": 80, "https": 443}
+IDLE_STREAM_SECONDS = 30.0  # An unwatched stream stays connected this long before it is closed
+
+
+def normalize_source(source):
+    """Key under which a stream is shared: same camera, same key.
+
+    Device indices ("0" or 0) become ints; URLs get a lowercase scheme and
+    host, their default port dropped and surrounding whitespace removed.
+    Paths, queries and credentials are kept as they are.
+    """
+    if isinstance(source, int):
+        return source
+    source = str(source).strip()
+    if source.isdigit():
+        return int(source)
+    parts = urlsplit(source)
+    if not parts.scheme or not parts.hostname:
+        return source  # A file path
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower()
+    if ":" in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        return source
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    userinfo = parts.netloc.rpartition("@")[0]
+    netloc = f"{userinfo}@{host}" if userinfo else host
+    return urlunsplit((scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+class Subscription:
+    """One consumer of a shared stream, with the FrameGrabber reading API.
+
+    ``latest()`` returns the hub's decoded frame itself: it is read-only
+    and shared with every other subscriber, so copy it before drawing.
+    ``stop()`` unbinds from the stream; see ``CaptureHub.unsubscribe``.
+    """
+
+    def __init__(self, hub, key, grabber, on_frame=None):
+        self.hub = hub
+        self.key = key
+        self.grabber = grabber
+        self.on_frame = on_frame
+        self.closed = False
+
+    @property
+    def name(self):
+        return self.grabber.name
+
+    @property
+    def connected(self):
+        return self.grabber.connected
+
+    @property
+    def error(self):
+        return self.grabber.error
+
+    @property
+    def running(self):
+        return not self.closed and self.grabber.running
+
+    def latest(self):
+        return self.grabber.latest()
+
+    def wait_for_frame(self, timeout):
+        """Block until the stream has a frame or fails; True if a frame arrived."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.latest()[0]:
+                return True
+            if self.error:
+                return False
+            time.sleep(0.05)
+        return bool(self.latest()[0])
+
+    def stop(self, wait=False, linger=True):
+        if not self.closed:
+            self.closed = True
+            self.hub.unsubscribe(self, wait, linger)
+
+
+class SharedStream:
+    def __init__(self, grabber):
+        self.grabber = grabber
+        self.subscribers = []
+        self.idle_timer = None  # Pending eviction while nobody is subscribed
+
+
+class CaptureHub:
+    """Pool of open camera streams, each opened once however many screens show it.
+
+    Streams are keyed by ``normalize_source`` and the ``capture`` decoder
+    settings, since the same camera decoded differently is a different stream. The first ``subscribe``
+    starts a FrameGrabber; later ones share its decoded frames, and each
+    subscriber's ``on_frame`` is called from the one grab thread. Streams
+    live independently of the widgets showing them: when the last
+    subscriber leaves, the stream stays connected for ``idle_seconds`` so a
+    rebuilt grid binds to it again without reconnecting, and is only
+    closed if nobody comes back in time.
+    """
+
+    def __init__(self, grabber_factory=FrameGrabber, idle_seconds=IDLE_STREAM_SECONDS):
+        self.grabber_factory = grabber_factory
+        self.idle_seconds = idle_seconds
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, source, name=None, on_frame=None, **options):
+        """Bind to a stream, opening it if needed; ``options`` (e.g. timeouts) apply when it opens."""
+        key = (normalize_source(source), options.get("capture"))
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                grabber = self.grabber_factory(key[0], name, on_frame=lambda sequence, frame, key=key:
+                                               self._fan_out(key, sequence, frame), **options)
+                stream = self._streams[key] = SharedStream(grabber)
+                grabber.start()
+            elif stream.idle_timer is not None:
+                stream.idle_timer.cancel()
+                stream.idle_timer = None
+                logging.info(f"Reusing idle stream {stream.grabber.name}")
+            else:
+                logging.info(f"Sharing open stream {stream.grabber.name} ({len(stream.subscribers) + 1} viewers)")
+            subscription = Subscription(self, key, stream.grabber, on_frame)
+            stream.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription, wait=False, linger=True):
+        """Unbind a subscriber; a stream left without any is evicted after ``idle_seconds``.
+
+        ``linger=False`` (or ``wait``) closes an unwatched stream right away,
+        for streams that were deliberately shut down rather than unbound.
+        """
+        with self._lock:
+            stream = self._streams.get(subscription.key)
+            if stream is None or subscription not in stream.subscribers:
+                return
+            stream.subscribers.remove(subscription)
+            if stream.subscribers:
+                return
+            if linger and not wait and self.idle_seconds > 0:
+                stream.idle_timer = threading.Timer(self.idle_seconds, self._evict, (subscription.key, stream))
+                stream.idle_timer.daemon = True
+                stream.idle_timer.start()
+                return
+            del self._streams[subscription.key]
+        stream.grabber.stop(wait)
+
+    def _evict(self, key, stream):
+        with self._lock:
+            if self._streams.get(key) is not stream or stream.subscribers:
+                return
+            del self._streams[key]
+        logging.info(f"Closing idle stream {stream.grabber.name}")
+        stream.grabber.stop()
+
+    def close(self):
+        """Stop every stream, e.g. when the application exits."""
+        with self._lock:
+            streams = list(self._streams.values())
+            self._streams.clear()
+        for stream in streams:
+            if stream.idle_timer is not None:
+                stream.idle_timer.cancel()
+            stream.grabber.stop()
+
+    def subscriber_count(self, source, capture=None):
+        with self._lock:
+            stream = self._streams.get((normalize_source(source), capture))
+            return len(stream.subscribers) if stream is not None else 0
+
+    def _fan_out(self, key, sequence, frame):
+        # Runs on the stream's grab thread
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                return
+            callbacks = [s.on_frame for s in stream.subscribers if s.on_frame is not None]
+        for callback in callbacks:
+            try:
+                callback(sequence, frame)
+            except Exception as e:
+                logging.error(f"Frame handler error ({stream.grabber.name}): {e}")
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """Return the process-wide CaptureHub."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = CaptureHub()
+        return _hub
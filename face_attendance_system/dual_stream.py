@@ -0,0 +1,116 @@
+import time
+import threading
+import cv2
+
+from capture_hub import get_hub
+from motion_gate import MotionGate, MOTION_ADDON, DEFAULT_MOTION_THRESHOLD
+from face_detector import ScaledDetector
+from utils.file_utils import addon_enabled
+
+MAIN_IDLE_SECONDS = 10.0  # Main stream closes after this long without motion or faces
+FACE_CHECK_EVERY = 5  # Without the Motion Detection add-on, every Nth substream frame is checked for faces
+SUB_MIN_FACE_SIZE = 20  # Smallest face looked for on the substream, in its pixels
+
+
+class DualStream:
+    """A camera's low-resolution substream plus its main stream, opened on demand.
+
+    Tiles are drawn from the substream, which also feeds a motion gate.
+    The main stream is only opened while there is motion or faces to
+    recognize and closed again MAIN_IDLE_SECONDS after the scene goes
+    quiet. With the Motion Detection add-on disabled, every
+    FACE_CHECK_EVERY-th substream frame is searched for faces instead and
+    the main stream opens when one is found. Without a substream, or with
+    ``main_always`` (a maximized tile), the main stream is used for
+    everything. ``main_capture`` is the
+    decoder for a main stream that is only analysed, never shown, e.g.
+    grayscale ffmpeg output.
+    """
+
+    def __init__(self, main_url, sub_url=None, name="", on_main_frame=None, main_always=False,
+                 motion_threshold=DEFAULT_MOTION_THRESHOLD, main_capture=None, **options):
+        self.main_url = main_url
+        self.sub_url = sub_url if sub_url and not main_always else None
+        self.name = name
+        self.on_main_frame = on_main_frame
+        self.main_always = main_always or self.sub_url is None
+        self.options = options  # FrameGrabber settings, e.g. open_timeout and read_timeout
+        self.main_options = dict(options)
+        if main_capture is not None and not self.main_always:
+            self.main_options["capture"] = main_capture
+        self.main = None
+        self.display = None
+        self.motion_gate = None
+        self.face_check = None
+        if addon_enabled(MOTION_ADDON):
+            self.motion_gate = MotionGate(motion_threshold)
+        elif not self.main_always:
+            # No motion to wait for, so faces seen on the substream open the main stream
+            self.face_check = ScaledDetector(min_face_size=SUB_MIN_FACE_SIZE)
+        self._sub_frames = 0
+        self._deadline = 0.0
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.main_always:
+            self.open_main()
+            self.display = self.main
+        else:
+            self.display = get_hub().subscribe(self.sub_url, f"{self.name} (sub)", on_frame=self._on_sub_frame,
+                                               **self.options)
+        return self
+
+    def stop(self):
+        if self.display is not None:
+            self.display.stop()
+        self.close_main()
+
+    @property
+    def main_open(self):
+        return self.main is not None
+
+    def open_main(self):
+        with self._lock:
+            if self.main is None:
+                self.main = get_hub().subscribe(self.main_url, self.name, on_frame=self.on_main_frame,
+                                            **self.main_options)
+                self._deadline = time.monotonic() + MAIN_IDLE_SECONDS
+
+    def close_main(self, linger=True):
+        with self._lock:
+            main, self.main = self.main, None
+        if main is not None:
+            main.stop(linger=linger)
+
+    def keep_main_open(self):
+        """Push back the idle deadline, e.g. while faces are being tracked."""
+        with self._lock:
+            self._deadline = time.monotonic() + MAIN_IDLE_SECONDS
+
+    def poll(self):
+        """Close an idle main stream; returns True if it was closed just now."""
+        with self._lock:
+            if self.main_always or self.main is None or time.monotonic() < self._deadline:
+                return False
+            main, self.main = self.main, None
+        main.stop(linger=False)  # Idle on purpose: stop decoding it now
+        return True
+
+    def main_shape(self):
+        """Frame shape of the main stream, or None before its first frame."""
+        main = self.main
+        frame = main.latest()[1] if main is not None else None
+        return None if frame is None else frame.shape
+
+    def _on_sub_frame(self, sequence, frame):
+        # Runs on the substream's grab thread
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.motion_gate is not None:
+            wanted = self.motion_gate.update(gray)
+        else:
+            self._sub_frames += 1
+            wanted = self._sub_frames % FACE_CHECK_EVERY == 0 and len(self.face_check.detect(gray)) > 0
+        if wanted:
+            self.keep_main_open()
+            if self.main is None:
+                self.open_main()
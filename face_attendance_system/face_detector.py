@@ -0,0 +1,220 @@
+import os
+import math
+import threading
+import logging
+import cv2
+import numpy as np
+
+from model_registry import cascade_file
+
+# Smallest face, in pixels at detection resolution, the detectors still find reliably
+DETECT_FACE_PIXELS = 30
+MIN_FACE_SIZE = 30  # Smallest face of interest in full-resolution pixels
+SCALE_FACTOR = 1.1
+MIN_NEIGHBORS = 5
+
+DEFAULT_BACKEND = "haar"
+# Local copy shipped with the app, falling back to one installed with OpenCV
+LBP_CASCADE_PATH = "models/lbpcascade_frontalface_improved.xml"
+LBP_CASCADE_NAMES = ("lbpcascade_frontalface_improved.xml", "lbpcascade_frontalface.xml")
+# OpenCV's own installs keep lbpcascades/ next to haarcascades/; pip wheels ship Haar files only
+OPENCV_SHARE_DIRS = ["/usr/share/opencv4", "/usr/local/share/opencv4", "/usr/share/opencv", "/usr/local/share/opencv"]
+YUNET_MODEL_PATH = "models/face_detection_yunet_2023mar.onnx"
+
+
+def lbp_cascade_file(path=LBP_CASCADE_PATH):
+    """Path of the LBP face cascade XML to load.
+
+    The local file wins; otherwise OpenCV's data directories are searched.
+    If none has it the local path is returned and loading it fails.
+    """
+    if os.path.exists(path):
+        return path
+    directories = []
+    haar_dir = getattr(getattr(cv2, "data", None), "haarcascades", None)
+    if haar_dir:
+        haar_dir = os.path.normpath(haar_dir)
+        directories += [haar_dir, os.path.join(os.path.dirname(haar_dir), "lbpcascades")]
+    directories += [os.path.join(share, "lbpcascades") for share in OPENCV_SHARE_DIRS]
+    for directory in directories:
+        for name in LBP_CASCADE_NAMES:
+            candidate = os.path.join(directory, name)
+            if os.path.exists(candidate):
+                return candidate
+    return path
+
+
+def parse_size(value, default=None):
+    """Positive integer from a camera.csv cell, or ``default`` when blank or invalid."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    if math.isnan(value) or value <= 0:
+        return default
+    return int(value)
+
+
+def detection_scale(frame_width, min_face_size=MIN_FACE_SIZE, detect_width=None):
+    """Factor to shrink a frame by before detection.
+
+    A fixed ``detect_width`` wins; otherwise the frame is shrunk as far as
+    possible while a face of ``min_face_size`` pixels still measures
+    DETECT_FACE_PIXELS. Frames are never enlarged.
+    """
+    if detect_width:
+        return min(1.0, detect_width / frame_width)
+    return min(1.0, DETECT_FACE_PIXELS / max(min_face_size, 1))
+
+
+_thread_classifiers = threading.local()
+
+
+class CascadeBackend:
+    """Haar or LBP cascade via ``CascadeClassifier.detectMultiScale``.
+
+    A classifier instance is not safe to share between threads, so each
+    thread loads its own copy of a cascade file on first use and shares it
+    between every backend used on that thread.
+    """
+
+    def __init__(self, path, scale_factor=SCALE_FACTOR, min_neighbors=MIN_NEIGHBORS):
+        self.path = path
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._classifier()  # Fail early on a missing or corrupt file
+
+    def _classifier(self):
+        cache = getattr(_thread_classifiers, "by_path", None)
+        if cache is None:
+            cache = _thread_classifiers.by_path = {}
+        classifier = cache.get(self.path)
+        if classifier is None:
+            classifier = cv2.CascadeClassifier(self.path)
+            if classifier.empty():
+                raise FileNotFoundError(f"Cascade file not found or corrupted: {self.path}")
+            cache[self.path] = classifier
+        return classifier
+
+    def detect(self, gray, min_size):
+        return self._classifier().detectMultiScale(gray, scaleFactor=self.scale_factor,
+                                                   minNeighbors=self.min_neighbors,
+                                                   minSize=(min_size, min_size))
+
+
+class YuNetBackend:
+    """OpenCV DNN face detector (YuNet) loaded from a local ONNX file."""
+
+    def __init__(self, path=YUNET_MODEL_PATH, score_threshold=0.8, nms_threshold=0.3, top_k=100):
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise RuntimeError("This OpenCV build has no FaceDetectorYN (needs 4.5.4 or newer).")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"YuNet model not found: {path}")
+        self.path = path
+        self.score_threshold = score_threshold
+        self.nms_threshold = nms_threshold
+        self.top_k = top_k
+        self._local = threading.local()
+        self._detector((320, 320))
+
+    def _detector(self, size):
+        detector = getattr(self._local, "detector", None)
+        if detector is None:
+            detector = cv2.FaceDetectorYN.create(self.path, "", size, self.score_threshold,
+                                                 self.nms_threshold, self.top_k)
+            self._local.detector = detector
+        return detector
+
+    def detect(self, gray, min_size):
+        height, width = gray.shape[:2]
+        detector = self._detector((width, height))
+        detector.setInputSize((width, height))
+        _, faces = detector.detect(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+        if faces is None:
+            return np.zeros((0, 4), np.int32)
+        boxes = np.round(faces[:, :4]).astype(np.int32)
+        return boxes[(boxes[:, 2] >= min_size) & (boxes[:, 3] >= min_size)]
+
+
+# Backend name -> factory taking the backend's own tuning parameters
+DETECTOR_BACKENDS = {
+    "haar": lambda **params: CascadeBackend(cascade_file(), **params),
+    "lbp": lambda path=LBP_CASCADE_PATH, **params: CascadeBackend(lbp_cascade_file(path), **params),
+    "yunet": YuNetBackend,
+}
+
+
+def create_backend(name=DEFAULT_BACKEND, **params):
+    """Build the detector backend ``name`` ("haar", "lbp" or "yunet")."""
+    if name not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown detector backend '{name}', expected one of {', '.join(DETECTOR_BACKENDS)}")
+    return DETECTOR_BACKENDS[name](**params)
+
+
+def backend_for_camera(name, params=None):
+    """Backend named in a camera.csv cell, falling back to the Haar cascade.
+
+    ``params`` maps backend names to their tuning parameters.
+    """
+    params = params or {}
+    name = name.strip().lower() if isinstance(name, str) and name.strip() else DEFAULT_BACKEND
+    try:
+        return create_backend(name, **params.get(name, {}))
+    except (ValueError, RuntimeError, FileNotFoundError, cv2.error) as e:
+        logging.error(f"Detector '{name}' unavailable, using {DEFAULT_BACKEND}: {e}")
+        return create_backend(DEFAULT_BACKEND, **params.get(DEFAULT_BACKEND, {}))
+
+
+class ScaledDetector:
+    """Runs a detector backend on a downscaled copy of the frame and maps boxes back.
+
+    Boxes are returned in full-resolution coordinates, so recognition
+    crops still come from the original frame. ``roi`` is an optional
+    RegionMask restricting where faces are looked for.
+    """
+
+    def __init__(self, backend=None, min_face_size=MIN_FACE_SIZE, detect_width=None, roi=None):
+        self.backend = backend if backend is not None else create_backend()
+        self.min_face_size = min_face_size
+        self.detect_width = detect_width
+        self.roi = roi
+
+    def detect(self, gray, context=None):
+        """Face boxes as an (n, 4) int array of full-resolution (x, y, w, h).
+
+        With an ROI only its bounding rectangles are scanned, and faces
+        centred outside the ROI polygons are dropped. ``context``, the
+        frame's FrameContext, supplies an already downscaled copy.
+        """
+        scale = detection_scale(gray.shape[1], self.min_face_size, self.detect_width)
+        if self.roi is None or self.roi.empty:
+            small = context.scaled_gray(scale) if context is not None else None
+            return self._detect(gray, scale, small)
+
+        found = []
+        for x, y, w, h in self.roi.rects(gray.shape):
+            if min(w, h) < self.min_face_size:
+                continue
+            faces = self._detect(gray[y:y+h, x:x+w], scale)
+            faces[:, :2] += (x, y)
+            found.extend(face for face in faces if self.roi.contains(face, gray.shape))
+        return np.array(found, np.int32).reshape(-1, 4)
+
+    def _detect(self, gray, scale, small=None):
+        height, width = gray.shape[:2]
+        if small is None:
+            small = gray
+            if scale < 1.0:
+                small = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        faces = self.backend.detect(small, max(1, round(self.min_face_size * scale)))
+        if len(faces) == 0:
+            return np.zeros((0, 4), np.int32)
+        faces = np.asarray(faces, np.int32)
+        if scale < 1.0:
+            faces = np.round(faces / scale).astype(np.int32)
+        # Keep boxes inside the frame so crops are never empty
+        faces[:, :2] = np.maximum(faces[:, :2], 0)
+        faces[:, 2] = np.minimum(faces[:, 2], width - faces[:, 0])
+        faces[:, 3] = np.minimum(faces[:, 3], height - faces[:, 1])
+        return faces
@@ -0,0 +1,138 @@
+import os
+import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+
+from face_recognition import FACE_SIZE
+from model_registry import cascade_file
+
+CACHE_DIR = "data/face_cache"
+NO_FACE_SUFFIX = ".none"
+MIN_POOL_IMAGES = 16  # Below this a process pool costs more than it saves
+
+# Detection settings, matching FaceRecognition.detect_faces
+SCALE_FACTOR = 1.1
+MIN_NEIGHBORS = 5
+MIN_FACE_SIZE = (30, 30)
+
+# Part of every cache key, so changing the preprocessing invalidates old crops
+PREPROCESS_VERSION = f"v1-{FACE_SIZE[0]}x{FACE_SIZE[1]}-{SCALE_FACTOR}-{MIN_NEIGHBORS}-{MIN_FACE_SIZE[0]}"
+
+_cascade = None
+
+
+def _load_cascade():
+    global _cascade
+    if _cascade is None:
+        _cascade = cv2.CascadeClassifier(cascade_file())
+        if _cascade.empty():
+            raise FileNotFoundError("Haarcascade file not found or corrupted.")
+    return _cascade
+
+
+def cache_key(data):
+    """Content-addressed key for an encoded image."""
+    digest = hashlib.sha1(PREPROCESS_VERSION.encode("ascii"))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def cache_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, key[:2], key + ".png")
+
+
+def extract_face(gray):
+    """Crop the largest detected face and resize it to FACE_SIZE, or return None."""
+    faces = _load_cascade().detectMultiScale(gray, scaleFactor=SCALE_FACTOR,
+                                             minNeighbors=MIN_NEIGHBORS, minSize=MIN_FACE_SIZE)
+    if len(faces) == 0:
+        return None
+    x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+    return cv2.resize(gray[y:y+h, x:x+w], FACE_SIZE)
+
+
+def preprocess_file(path, cache_dir=CACHE_DIR):
+    """Return ``(path, crop, status)`` for one training image.
+
+    ``status`` is "cached", "detected", "no_face" or "unreadable"; ``crop``
+    is None unless a face was found.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return path, None, "unreadable"
+
+    key = cache_key(data)
+    crop_path = cache_path(key, cache_dir)
+    if os.path.exists(crop_path):
+        crop = cv2.imread(crop_path, cv2.IMREAD_GRAYSCALE)
+        if crop is not None:
+            return path, crop, "cached"
+    if os.path.exists(crop_path + NO_FACE_SUFFIX):
+        return path, None, "no_face"
+
+    gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return path, None, "unreadable"
+
+    crop = extract_face(gray)
+    os.makedirs(os.path.dirname(crop_path), exist_ok=True)
+    if crop is None:
+        open(crop_path + NO_FACE_SUFFIX, "wb").close()
+        return path, None, "no_face"
+
+    # Write under a temporary name first so a concurrent reader never sees half a file
+    tmp_path = f"{crop_path}.{os.getpid()}.tmp.png"
+    cv2.imwrite(tmp_path, crop)
+    os.replace(tmp_path, crop_path)
+    return path, crop, "detected"
+
+
+def preprocess_images(paths, workers=None, progress=None, cancelled=None, cache_dir=CACHE_DIR):
+    """Decode, detect and crop faces for ``paths`` across a process pool.
+
+    Returns ``(crops, stats)`` where ``crops`` maps each path to its face crop
+    (None when no usable face was found) and ``stats`` counts cached,
+    detected, no_face and unreadable images plus the throughput.
+    ``progress(done, total)`` is called as images finish; ``cancelled()``
+    returning True stops early, leaving the remaining paths out of ``crops``.
+    """
+    paths = list(paths)
+    stats = {"images": len(paths), "cached": 0, "detected": 0, "no_face": 0, "unreadable": 0}
+    crops = {}
+    start = time.perf_counter()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    use_pool = workers > 1 and len(paths) >= MIN_POOL_IMAGES
+
+    def collect(results):
+        for path, crop, status in results:
+            crops[path] = crop
+            stats[status] += 1
+            if progress:
+                progress(len(crops), len(paths))
+            if cancelled and cancelled():
+                return False
+        return True
+
+    if use_pool:
+        # Spawned workers: forking a process that runs Qt and camera threads is unsafe
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        finished = False
+        try:
+            chunksize = max(1, min(32, len(paths) // (workers * 4)))
+            finished = collect(pool.map(preprocess_file, paths, [cache_dir] * len(paths), chunksize=chunksize))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=not finished)
+    else:
+        collect(preprocess_file(path, cache_dir) for path in paths)
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["images_per_sec"] = len(crops) / elapsed if elapsed > 0 else 0.0
+    return crops, stats
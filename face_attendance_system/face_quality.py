@@ -0,0 +1,87 @@
+import os
+import threading
+import logging
+import cv2
+
+MIN_FACE_PIXELS = 48  # Smallest face side worth recognizing
+MIN_SHARPNESS = 50.0  # Laplacian variance of the normalised crop
+MIN_BRIGHTNESS = 40
+MAX_BRIGHTNESS = 215
+MIN_CONTRAST = 20.0  # Standard deviation of the gray levels
+MIN_EYES = 1  # Eyes the optional frontalness check has to find
+QUALITY_SIZE = (96, 96)  # Crops are scored at one size so thresholds do not depend on distance
+REPORT_EVERY = 500  # Crops between log lines with the per-camera counts
+
+EYE_CASCADE_PATH = "models/haarcascade_eye.xml"
+EYE_CASCADE_NAME = "haarcascade_eye.xml"
+
+
+class QualityGate:
+    """Cheap checks that decide whether a face crop is worth an LBPH prediction.
+
+    Rejects crops that are too small, blurred (low Laplacian variance), too
+    dark or bright, or flat; with ``check_eyes`` the upper half of the crop
+    must also show an eye, which filters out profiles and extreme angles.
+    Counts accepted and skipped crops, by reason, for the camera it serves.
+    """
+
+    def __init__(self, name="", check_eyes=False, min_size=MIN_FACE_PIXELS, min_sharpness=MIN_SHARPNESS,
+                 brightness=(MIN_BRIGHTNESS, MAX_BRIGHTNESS), min_contrast=MIN_CONTRAST):
+        self.name = name
+        self.check_eyes = check_eyes
+        self.min_size = min_size
+        self.min_sharpness = min_sharpness
+        self.brightness = brightness
+        self.min_contrast = min_contrast
+        self.accepted = 0
+        self.skipped = {}
+        self._local = threading.local()
+
+    def _eye_cascade(self):
+        cascade = getattr(self._local, "eye_cascade", None)
+        if cascade is None:
+            path = EYE_CASCADE_PATH if os.path.exists(EYE_CASCADE_PATH) else cv2.data.haarcascades + EYE_CASCADE_NAME
+            cascade = cv2.CascadeClassifier(path)
+            if cascade.empty():
+                raise FileNotFoundError("Eye cascade file not found or corrupted.")
+            self._local.eye_cascade = cascade
+        return cascade
+
+    def reason(self, crop):
+        """Why ``crop`` should be skipped, or None if it is good enough."""
+        height, width = crop.shape[:2]
+        if min(height, width) < self.min_size:
+            return "small"
+        small = cv2.resize(crop, QUALITY_SIZE, interpolation=cv2.INTER_AREA)
+        mean, std = cv2.meanStdDev(small)
+        if not self.brightness[0] <= mean[0][0] <= self.brightness[1]:
+            return "exposure"
+        if std[0][0] < self.min_contrast:
+            return "contrast"
+        if cv2.Laplacian(small, cv2.CV_64F).var() < self.min_sharpness:
+            return "blur"
+        if self.check_eyes:
+            eyes = self._eye_cascade().detectMultiScale(small[:QUALITY_SIZE[1] // 2], 1.1, 3, minSize=(12, 12))
+            if len(eyes) < MIN_EYES:
+                return "angle"
+        return None
+
+    def accept(self, crop):
+        """Score ``crop``, update the counts and return True if it should be recognized."""
+        reason = self.reason(crop)
+        if reason is None:
+            self.accepted += 1
+        else:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        if (self.accepted + self.skipped_total) % REPORT_EVERY == 0:
+            logging.info(self.summary())
+        return reason is None
+
+    @property
+    def skipped_total(self):
+        return sum(self.skipped.values())
+
+    def summary(self):
+        reasons = ", ".join(f"{k} {v}" for k, v in sorted(self.skipped.items()))
+        text = f"Face quality {self.name}: {self.accepted} accepted, {self.skipped_total} skipped"
+        return f"{text} ({reasons})" if reasons else text
@@ -1,76 +1,143 @@
-import os
+import functools
 import cv2
-import pickle
 import numpy as np
+from model_registry import get_registry
+from face_tracker import FaceTracker
+from face_detector import ScaledDetector, backend_for_camera, MIN_FACE_SIZE, DEFAULT_BACKEND
+from face_quality import QualityGate
+from motion_gate import MotionGate, MOTION_ADDON, DEFAULT_MOTION_THRESHOLD
+from utils.file_utils import addon_enabled
+from frame_context import FrameContext
 
-# Paths
-HAARCASCADE_PATH = "models/haarcascade_frontalface_default.xml"
-TRAINED_MODEL_PATH = "models/trained_model.yml"
-LABEL_NAMES_PATH = "models/label_names.pkl"
+# Size face crops are normalised to before recognition
+FACE_SIZE = (200, 200)
 
-class FaceRecognition:
-    def __init__(self):
-        try:
-            # Load face cascade
-            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + HAARCASCADE_PATH)
-            if self.face_cascade.empty():
-                raise FileNotFoundError("Haarcascade file not found or corrupted.")
-
-            # Load face recognizer
-            self.recognizer = cv2.face.LBPHFaceRecognizer_create()
-            self.label_names = {}
-            self.load_model()
-        except Exception as e:
-            print(f"Error initializing FaceRecognition: {e}")
 
-    def load_model(self):
-        try:
-            if not os.path.exists(TRAINED_MODEL_PATH):
-                raise FileNotFoundError(f"Trained model file '{TRAINED_MODEL_PATH}' not found.")
+def predict_faces(model, gray, boxes):
+    """(label, confidence) for every (x, y, w, h) box, scored in one batch at FACE_SIZE."""
+    crops = [cv2.resize(gray[y:y+h, x:x+w], FACE_SIZE) for (x, y, w, h) in boxes]
+    return model.engine.predict_batch(crops)
 
-            self.recognizer.read(TRAINED_MODEL_PATH)
+class FaceRecognition:
+    def __init__(self, motion_threshold=DEFAULT_MOTION_THRESHOLD, min_face_size=MIN_FACE_SIZE, detect_width=None,
+                 detector=DEFAULT_BACKEND, camera_name="", check_eyes=False):
+        # Cascade, recognizer and label names are shared by every stream in the process
+        self.registry = get_registry()
+        # Detection runs on a copy shrunk as far as min_face_size allows
+        self.detector = ScaledDetector(backend_for_camera(detector), min_face_size, detect_width)
+        # Full detection only every few frames; faces are tracked in between
+        self.tracker = FaceTracker()
+        # Blurred, tiny or badly lit crops are not worth a prediction
+        self.quality = QualityGate(camera_name, check_eyes)
+        # With the Motion Detection add-on on, still scenes skip detection entirely
+        self.motion_gate = MotionGate(motion_threshold) if addon_enabled(MOTION_ADDON) else None
+
+    @property
+    def face_cascade(self):
+        return self.registry.face_cascade()
 
-            if not os.path.exists(LABEL_NAMES_PATH):
-                raise FileNotFoundError(f"Label names file '{LABEL_NAMES_PATH}' not found.")
+    @property
+    def engine(self):
+        return self.registry.current().engine
 
-            with open(LABEL_NAMES_PATH, "rb") as f:
-                self.label_names = pickle.load(f)
+    @property
+    def label_names(self):
+        return self.registry.current().label_names
 
-            if not self.label_names:
-                raise ValueError("Label names file is empty or corrupted.")
+    def load_model(self):
+        try:
+            self.registry.reload()
+            if self.registry.current().empty:
+                raise FileNotFoundError("No trained model found.")
         except Exception as e:
             print(f"Error loading model: {e}")
 
     def detect_faces(self, frame):
         try:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-            return gray, faces
+            return gray, self.detect_in_gray(gray)
         except cv2.error as e:
             print(f"OpenCV error in detect_faces: {e}")
             return frame, []
 
-    def recognize_faces(self, gray, faces):
-        recognized_faces = []
+    def detect_in_gray(self, gray):
+        return self.detector.detect(gray)
+
+    def track_faces(self, frame, context=None):
+        """Return (gray, tracks) for a frame, detecting only when the tracker needs it.
+
+        Without motion and without faces already being tracked, the frame is
+        not analysed at all. ``context`` is the frame's FrameContext, if the
+        caller already has one.
+        """
+        context = context or FrameContext(frame)
+        gray = context.gray
+        if (self.motion_gate is not None and not self.motion_gate.update(gray, context)
+                and not self.tracker.tracks):
+            return gray, []
         try:
-            for (x, y, w, h) in faces:
-                face = gray[y:y+h, x:x+w]
-                face_resized = cv2.resize(face, (200, 200))
+            tracks = self.tracker.update(gray, functools.partial(self.detector.detect, context=context))
+        except cv2.error as e:
+            print(f"OpenCV error in track_faces: {e}")
+            self.tracker.reset()
+            return gray, []
+        return gray, [t for t in tracks if t.clipped_box(gray.shape) is not None]
 
-                label_id, confidence = self.recognizer.predict(face_resized)
-                person_name = self.label_names.get(label_id, "Unknown")
+    def predict_crops(self, gray, faces, model):
+        return predict_faces(model, gray, faces)
+
+    def recognize_faces(self, gray, faces, model=None):
+        recognized_faces = []
+        model = model or self.registry.current()
+        if model.empty:
+            return recognized_faces
+        try:
+            predictions = self.predict_crops(gray, faces, model)
+            for (x, y, w, h), (label_id, confidence) in zip(faces, predictions):
+                person_name = model.name_for(label_id)
                 recognized_faces.append((x, y, w, h, person_name, confidence))
         except Exception as e:
             print(f"Error in recognize_faces: {e}")
         return recognized_faces
 
-    def update_frame(self, frame):
-        gray, faces = self.detect_faces(frame)
-        recognized_faces = self.recognize_faces(gray, faces)
+    def identify_tracks(self, gray, tracks, model=None):
+        """Return (x, y, w, h, name, confidence) per track, predicting only where needed.
+
+        Each track keeps a vote over its predictions; tracks whose identity
+        has settled reuse it until it is due for re-verification. Crops that
+        fail the quality gate are not predicted and wait for a better frame.
+        """
+        model = model or self.registry.current()
+        boxes = [t.clipped_box(gray.shape) for t in tracks]
+        pending = [(t, (x, y, w, h)) for t, (x, y, w, h) in zip(tracks, boxes)
+                   if t.identity.needs_prediction(t.box, model.version)
+                   and self.quality.accept(gray[y:y+h, x:x+w])]
+        if pending and not model.empty:
+            try:
+                predictions = self.predict_crops(gray, [box for _, box in pending], model)
+                for (track, _), (label_id, confidence) in zip(pending, predictions):
+                    track.identity.add_vote(label_id, confidence, track.box)
+            except Exception as e:
+                print(f"Error in identify_tracks: {e}")
+
+        identified = []
+        for track, (x, y, w, h) in zip(tracks, boxes):
+            identity = track.identity
+            if identity.label is None:
+                identified.append((x, y, w, h, "Unknown", 0.0))
+            else:
+                identified.append((x, y, w, h, model.name_for(identity.label), identity.confidence))
+        return identified
+
+    def update_frame(self, frame, context=None):
+        # One model snapshot per frame; a hot reload takes effect on the next one
+        model = self.registry.current()
+        gray, tracks = self.track_faces(frame, context)
+        recognized_faces = self.identify_tracks(gray, tracks, model)
 
-        for (x, y, w, h, person_name, confidence) in recognized_faces:
+        for track, (x, y, w, h, person_name, confidence) in zip(tracks, recognized_faces):
             color = (0, 255, 0) if person_name != "Unknown" else (0, 0, 255)
             cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
-            cv2.putText(frame, f"{person_name} ({confidence:.2f})", (x, y-10),
+            cv2.putText(frame, f"#{track.id} {person_name} ({confidence:.2f})", (x, y-10),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
         return frame
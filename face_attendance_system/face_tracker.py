@@ -0,0 +1,210 @@
+import itertools
+import cv2
+import numpy as np
+
+DETECT_EVERY = 5  # Run the full cascade on every Nth frame
+MIN_IOU = 0.3  # Overlap needed to match a detection to an existing track
+MAX_MISSED_DETECTIONS = 1  # Detection rounds a track may go unconfirmed
+MIN_TRACKED_POINTS = 4  # Fewer surviving flow points means the track is lost
+FLOW_GRID = 5  # Points sampled per box side for optical flow
+MAX_FLOW_ERROR = 20.0
+
+# Per-track identity voting
+MIN_VOTES = 3  # Predictions needed before an identity can settle
+SETTLE_SHARE = 0.6  # Share of the vote weight the leading label needs
+VOTE_DECAY = 0.9  # Older votes fade so a wrong identity can be corrected
+REVERIFY_EVERY = 30  # Frames between checks of a settled identity
+REVERIFY_IOU = 0.5  # Box overlap with the last verified box below which we re-check
+
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0.0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0.0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class Identity:
+    """Confidence-weighted vote over the predictions made for one track.
+
+    Predictions are LBPH (label, distance) pairs, so a lower distance gives
+    a vote more weight. Once one label holds most of the weight after
+    MIN_VOTES predictions the identity is settled and the track is only
+    re-checked every REVERIFY_EVERY frames or when its box jumps.
+    """
+
+    def __init__(self):
+        self.weights = {}
+        self.distances = {}
+        self.votes = 0
+        self.label = None
+        self.confidence = None
+        self.settled = False
+        self.model_version = None
+        self.verified_box = None
+        self.since_verify = 0
+
+    def reset(self):
+        self.__init__()
+
+    def needs_prediction(self, box, model_version):
+        if model_version != self.model_version:
+            # Labels of a retrained model need not mean the same people
+            self.reset()
+            self.model_version = model_version
+            return True
+        if not self.settled:
+            return True
+        return self.since_verify >= REVERIFY_EVERY or iou(box, self.verified_box) < REVERIFY_IOU
+
+    def add_vote(self, label, distance, box):
+        for key in self.weights:
+            self.weights[key] *= VOTE_DECAY
+        self.weights[label] = self.weights.get(label, 0.0) + 1.0 / (1.0 + distance)
+        self.distances.setdefault(label, []).append(distance)
+        self.votes += 1
+        self.verified_box = box
+        self.since_verify = 0
+
+        self.label = max(self.weights, key=self.weights.get)
+        recent = self.distances[self.label][-MIN_VOTES:]
+        self.confidence = sum(recent) / len(recent)
+        share = self.weights[self.label] / sum(self.weights.values())
+        self.settled = self.votes >= MIN_VOTES and share >= SETTLE_SHARE
+
+
+class Track:
+    """One face followed across frames under a stable ID."""
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(float(v) for v in box)
+        self.missed = 0
+        self.age = 0
+        self.identity = Identity()
+
+    def clipped_box(self, shape):
+        """Integer (x, y, w, h) box clipped to a frame of ``shape``, or None if outside."""
+        height, width = shape[:2]
+        x, y, w, h = self.box
+        x0, y0 = max(0, int(round(x))), max(0, int(round(y)))
+        x1, y1 = min(width, int(round(x + w))), min(height, int(round(y + h)))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
+    def flow_points(self):
+        """Grid of points inside the central part of the box."""
+        x, y, w, h = self.box
+        xs = np.linspace(x + 0.2 * w, x + 0.8 * w, FLOW_GRID)
+        ys = np.linspace(y + 0.2 * h, y + 0.8 * h, FLOW_GRID)
+        return np.array([(px, py) for py in ys for px in xs], np.float32)
+
+
+class FaceTracker:
+    """Runs face detection every few frames and follows faces in between.
+
+    Between detections each track's box is moved by the median optical
+    flow of a grid of points inside it and rescaled by how much the points
+    spread apart. A full detection runs every ``detect_every`` frames, when
+    there are no tracks, or as soon as a track loses its points; detections
+    are matched to tracks by overlap so each face keeps its ID.
+    """
+
+    def __init__(self, detect_every=DETECT_EVERY):
+        self.detect_every = max(1, int(detect_every))
+        self.tracks = []
+        self._ids = itertools.count(1)
+        self._prev_gray = None
+        self._since_detection = 0
+
+    def reset(self):
+        self.tracks = []
+        self._prev_gray = None
+        self._since_detection = 0
+
+    def update(self, gray, detect):
+        """Advance to a new grayscale frame and return the live tracks.
+
+        ``detect(gray)`` must return (x, y, w, h) face boxes; it is only
+        called on detection frames.
+        """
+        lost = False
+        if self.tracks and self._prev_gray is not None and self._prev_gray.shape == gray.shape:
+            lost = not self._propagate(self._prev_gray, gray)
+        elif self._prev_gray is not None and self._prev_gray.shape != gray.shape:
+            self.tracks = []
+
+        self._since_detection += 1
+        if lost or not self.tracks or self._since_detection >= self.detect_every:
+            self._match(detect(gray))
+            self._since_detection = 0
+
+        self._prev_gray = gray
+        for track in self.tracks:
+            track.age += 1
+            track.identity.since_verify += 1
+        return list(self.tracks)
+
+    def _propagate(self, prev_gray, gray):
+        """Move every track by optical flow; return False if any track was lost."""
+        grids = [track.flow_points() for track in self.tracks]
+        points = np.concatenate(grids).reshape(-1, 1, 2)
+        moved, status, error = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None, **LK_PARAMS)
+        good = (status.reshape(-1) == 1) & (error.reshape(-1) < MAX_FLOW_ERROR)
+        moved = moved.reshape(-1, 2)
+
+        all_tracked = True
+        offset = 0
+        for track, grid in zip(self.tracks, grids):
+            keep = good[offset:offset + len(grid)]
+            old, new = grid[keep], moved[offset:offset + len(grid)][keep]
+            offset += len(grid)
+            if len(old) < MIN_TRACKED_POINTS:
+                all_tracked = False
+                continue
+
+            shift = np.median(new - old, axis=0)
+            old_spread = np.std(old, axis=0).mean()
+            scale = np.std(new, axis=0).mean() / old_spread if old_spread > 0 else 1.0
+            x, y, w, h = track.box
+            cx, cy = x + w / 2 + shift[0], y + h / 2 + shift[1]
+            w, h = w * scale, h * scale
+            track.box = (cx - w / 2, cy - h / 2, w, h)
+        return all_tracked
+
+    def _match(self, detections):
+        """Greedily assign detections to tracks by overlap; start tracks for the rest."""
+        detections = [tuple(float(v) for v in box) for box in detections]
+        pairs = sorted(((iou(track.box, box), t, d)
+                        for t, track in enumerate(self.tracks)
+                        for d, box in enumerate(detections)), reverse=True)
+        matched_tracks, matched_detections = set(), set()
+        for overlap, t, d in pairs:
+            if overlap < MIN_IOU:
+                break
+            if t in matched_tracks or d in matched_detections:
+                continue
+            self.tracks[t].box = detections[d]
+            self.tracks[t].missed = 0
+            matched_tracks.add(t)
+            matched_detections.add(d)
+
+        survivors = []
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+                if track.missed > MAX_MISSED_DETECTIONS:
+                    continue
+            survivors.append(track)
+        for d, box in enumerate(detections):
+            if d not in matched_detections:
+                survivors.append(Track(next(self._ids), box))
+        self.tracks = survivors
@@ -0,0 +1,165 @@
+import shutil
+import logging
+import threading
+import subprocess
+from collections import namedtuple
+import cv2
+import numpy as np
+
+FFMPEG = "ffmpeg"
+FFPROBE = "ffprobe"
+PIXEL_FORMATS = {"gray": 1, "gray8": 1, "bgr24": 3}  # Channels per pixel
+
+
+def ffmpeg_available():
+    return shutil.which(FFMPEG) is not None
+
+
+def parse_capture_size(value):
+    """``(width, height)`` from "1280x720", ``(width, None)`` from "640", else None."""
+    if isinstance(value, (int, float)) and value == value:
+        value = str(int(value))  # A width-only cell read back as a number
+    if not isinstance(value, str) or not value.strip():
+        return None
+    parts = value.lower().replace(" ", "").split("x")
+    try:
+        sizes = [int(float(part)) for part in parts]
+    except ValueError:
+        return None
+    if len(sizes) == 1 and sizes[0] > 0:
+        return sizes[0], None
+    if len(sizes) == 2 and sizes[0] > 0 and sizes[1] > 0:
+        return sizes[0], sizes[1]
+    return None
+
+
+def probe_size(source, timeout):
+    """Frame size of a stream's first video track, via ffprobe."""
+    cmd = [FFPROBE, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height",
+           "-of", "csv=p=0:s=x", str(source)]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout).stdout
+        width, height = (int(v) for v in output.strip().splitlines()[0].split("x")[:2])
+        return width, height
+    except (OSError, subprocess.TimeoutExpired, ValueError, IndexError) as e:
+        raise ConnectionError(f"Could not probe stream size: {e}")
+
+
+class FFmpegCapture:
+    """``cv2.VideoCapture`` look-alike reading raw frames from an ffmpeg pipe.
+
+    ffmpeg decodes, scales to ``size`` and converts to ``pixel_format``
+    ("gray" or "bgr24") itself, so the Python side only copies finished
+    frames out of the pipe with ``readinto``: no per-frame allocation and,
+    for gray output, no colour conversion. With ``keyframes_only`` the
+    decoder skips everything but keyframes (``-skip_frame nokey``), a
+    low-rate mode for analysis. ``read()`` returns a new array per frame,
+    since FrameGrabber shares every frame it publishes and must never see
+    it overwritten; pass ``image`` to read into your own. ffmpeg's error
+    output is logged.
+    """
+
+    def __init__(self, source, pixel_format="bgr24", size=None, keyframes_only=False,
+                 open_timeout=5.0, read_timeout=5.0):
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pixel format: {pixel_format}")
+        self.source = source
+        self.pixel_format = "gray" if pixel_format == "gray8" else pixel_format
+        self.keyframes_only = keyframes_only
+        width, height = size if size else (None, None)
+        if width is None or height is None:
+            source_width, source_height = probe_size(source, open_timeout)
+            if width is None:
+                width, height = source_width, source_height
+            else:
+                height = max(2, round(source_height * width / source_width / 2) * 2)
+        self.width, self.height = width, height
+        channels = PIXEL_FORMATS[self.pixel_format]
+        self.shape = (height, width) if channels == 1 else (height, width, channels)
+        self.frame_bytes = width * height * channels
+        self._process = subprocess.Popen(self._command(open_timeout, read_timeout), stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                         bufsize=0)
+        self._stderr_thread = threading.Thread(target=self._log_stderr, args=(self._process.stderr,),
+                                               name=f"ffmpeg-log-{source}", daemon=True)
+        self._stderr_thread.start()
+
+    def _log_stderr(self, stream):
+        # Decode and connection errors; -loglevel error keeps this quiet otherwise
+        for line in iter(stream.readline, b""):
+            message = line.decode("utf-8", "replace").strip()
+            if message:
+                logging.warning(f"ffmpeg ({self.source}): {message}")
+        stream.close()
+
+    def _command(self, open_timeout, read_timeout):
+        source = str(self.source)
+        cmd = [FFMPEG, "-nostdin", "-loglevel", "error", "-fflags", "nobuffer", "-flags", "low_delay"]
+        if source.lower().startswith("rtsp://"):
+            # Socket timeout in microseconds; also bounds the connection
+            cmd += ["-rtsp_transport", "tcp", "-timeout", str(int(max(open_timeout, read_timeout) * 1e6))]
+        elif "://" in source:
+            cmd += ["-rw_timeout", str(int(max(open_timeout, read_timeout) * 1e6))]
+        if self.keyframes_only:
+            cmd += ["-skip_frame", "nokey"]
+        cmd += ["-i", source, "-an", "-sn", "-vsync", "0",
+                "-vf", f"scale={self.width}:{self.height}",
+                "-f", "rawvideo", "-pix_fmt", self.pixel_format, "pipe:1"]
+        return cmd
+
+    def isOpened(self):
+        return self._process is not None and self._process.poll() is None
+
+    def read(self, image=None):
+        if self._process is None:
+            return False, None
+        if (image is not None and image.shape == self.shape and image.dtype == np.uint8
+                and image.flags.writeable and image.flags.c_contiguous):
+            target = image
+        else:
+            # Filled straight from the pipe, so a new frame costs an allocation but no copy
+            target = image = np.empty(self.shape, np.uint8)
+        view = memoryview(target).cast("B")
+        received = 0
+        while received < self.frame_bytes:
+            count = self._process.stdout.readinto(view[received:])
+            if not count:
+                return False, None
+            received += count
+        return True, image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        return 0.0
+
+    def set(self, prop, value):
+        return False  # Nothing is buffered on our side; other properties are fixed at start
+
+    def release(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        process.kill()
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            logging.warning(f"ffmpeg for {self.source} did not exit")
+        process.stdout.close()
+
+
+class FFmpegSettings(namedtuple("FFmpegSettings", "pixel_format size keyframes_only")):
+    """How a FrameGrabber should decode a stream through ffmpeg; hashable, so streams
+    with different settings are shared separately."""
+
+    def open(self, source, open_timeout, read_timeout):
+        if not ffmpeg_available():
+            raise ConnectionError("ffmpeg not found on PATH")
+        cap = FFmpegCapture(source, self.pixel_format, self.size, self.keyframes_only,
+                            open_timeout, read_timeout)
+        if not cap.isOpened():
+            cap.release()
+            raise ConnectionError("Failed to start ffmpeg")
+        return cap
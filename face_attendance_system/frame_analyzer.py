@@ -0,0 +1,96 @@
+import logging
+import functools
+import numpy as np
+
+from model_registry import get_registry
+from face_tracker import FaceTracker
+from face_detector import ScaledDetector, backend_for_camera, parse_size
+from roi_mask import RegionMask, parse_roi
+from face_quality import QualityGate
+from motion_gate import MotionGate, MOTION_ADDON, parse_threshold
+from utils.file_utils import addon_enabled
+from frame_context import FrameContext
+from face_recognition import predict_faces
+
+MIN_FACE_SIZE = 50  # Smallest face detected on camera streams, in full-resolution pixels
+DETECTOR_PARAMS = {"haar": {"min_neighbors": 4}, "lbp": {"min_neighbors": 4}}  # Per-backend tuning
+NO_LABEL = -1
+
+# One detected face; label is NO_LABEL until the track's identity is known
+RECORD_DTYPE = np.dtype([("track", np.int32), ("x", np.int32), ("y", np.int32), ("w", np.int32),
+                         ("h", np.int32), ("label", np.int32), ("confidence", np.float32)])
+
+
+def is_enabled(value):
+    """True for the truthy spellings used in camera.csv flag columns."""
+    return str(value).strip().lower() in ("true", "1", "yes")
+
+
+class FrameAnalyzer:
+    """Face analysis state of one camera: motion gate, detector, tracker and quality gate.
+
+    ``analyze`` takes a frame's FrameContext (or a grayscale frame) and
+    returns the faces in it as RECORD_DTYPE records. It holds no Qt objects, so it can run in the GUI
+    process or in an analysis worker process.
+    """
+
+    def __init__(self, camera_info, registry=None):
+        self.camera_info = camera_info
+        self.name = camera_info.get('name', camera_info.get('ip', ''))
+        self.registry = registry or get_registry()
+        self.tracker = FaceTracker()
+        self.detector = ScaledDetector(backend_for_camera(camera_info.get('detector'), DETECTOR_PARAMS),
+                                       parse_size(camera_info.get('min_face_size'), MIN_FACE_SIZE),
+                                       parse_size(camera_info.get('detect_width')),
+                                       roi=self.load_roi())
+        self.quality = QualityGate(self.name, is_enabled(camera_info.get('eye_check', '')))
+        self.active = False  # Last frame had motion or faces
+        self.motion_gate = None
+        if addon_enabled(MOTION_ADDON):
+            self.motion_gate = MotionGate(parse_threshold(camera_info.get('motion_threshold')))
+
+    def load_roi(self):
+        try:
+            return RegionMask(parse_roi(self.camera_info.get('roi')))
+        except ValueError as e:
+            logging.error(f"Ignoring invalid ROI for {self.name}: {e}")
+            return None
+
+    def reset(self):
+        """Forget tracks and background, e.g. after the stream reconnects."""
+        self.tracker.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def analyze(self, context):
+        if not isinstance(context, FrameContext):
+            context = FrameContext(context)
+        gray = context.gray
+        model = self.registry.current()
+        motion = self.motion_gate is not None and self.motion_gate.update(gray, context)
+        if self.motion_gate is not None and not motion and not self.tracker.tracks:
+            self.active = False
+            return np.zeros(0, RECORD_DTYPE)
+        # The detector only runs every few frames; faces are tracked in between
+        tracks = self.tracker.update(gray, functools.partial(self.detector.detect, context=context))
+
+        boxes = [(track, track.clipped_box(gray.shape)) for track in tracks]
+        boxes = [(track, box) for track, box in boxes if box is not None]
+        # Predict until a track's identity settles, then only re-verify now and then
+        if not model.empty:
+            pending = [(track, (x, y, w, h)) for track, (x, y, w, h) in boxes
+                       if track.identity.needs_prediction(track.box, model.version)
+                       and self.quality.accept(gray[y:y+h, x:x+w])]
+            if pending:
+                predictions = predict_faces(model, gray, [box for _, box in pending])
+                for (track, _), (label, confidence) in zip(pending, predictions):
+                    track.identity.add_vote(label, confidence, track.box)
+
+        records = []
+        for track, (x, y, w, h) in boxes:
+            identity = track.identity
+            label = NO_LABEL if identity.label is None else identity.label
+            confidence = 0.0 if identity.confidence is None else identity.confidence
+            records.append((track.id, x, y, w, h, label, confidence))
+        self.active = motion or bool(records)
+        return np.array(records, RECORD_DTYPE)
@@ -0,0 +1,66 @@
+import cv2
+
+
+class FrameContext:
+    """The images derived from one frame, each computed at most once.
+
+    The motion gate, detector, recognizer and renderer all ask the context
+    instead of converting the frame themselves: ``gray`` is converted once,
+    ``scaled_gray`` caches every downscaled size (built from the nearest
+    larger one already made), and ``display_bgr`` is the tile-sized colour
+    image the renderer draws on. ``frame`` may be BGR or already gray.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._gray = frame if frame.ndim == 2 else None
+        self._scaled = {}
+        self._display = {}
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def shape(self):
+        return self.frame.shape[:2]
+
+    def scaled_size(self, scale):
+        height, width = self.shape
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def scaled_gray(self, scale):
+        """Grayscale frame shrunk by ``scale`` (<= 1)."""
+        if scale >= 1.0:
+            return self.gray
+        size = self.scaled_size(scale)
+        small = self._scaled.get(size)
+        if small is None:
+            # Shrink the smallest cached image that is still larger, not the full frame
+            source = min((image for (w, h), image in self._scaled.items() if w >= size[0] and h >= size[1]),
+                         key=lambda image: image.shape[1], default=self.gray)
+            small = self._scaled[size] = cv2.resize(source, size, interpolation=cv2.INTER_AREA)
+        return small
+
+    def display_bgr(self, width, height):
+        """A drawable BGR copy fitted inside ``width`` x ``height``, keeping the aspect ratio.
+
+        The same array is returned for the same size, so only one renderer
+        should draw on it.
+        """
+        frame_height, frame_width = self.shape
+        scale = min(width / frame_width, height / frame_height)
+        size = self.scaled_size(scale) if scale > 0 else (frame_width, frame_height)
+        image = self._display.get(size)
+        if image is None:
+            if size == (frame_width, frame_height):
+                image = self.frame.copy()
+            else:
+                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+                image = cv2.resize(self.frame, size, interpolation=interpolation)
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            self._display[size] = image
+        return image
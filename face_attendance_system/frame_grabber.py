@@ -0,0 +1,146 @@
+import random
+import logging
+import threading
+import cv2
+
+OPEN_TIMEOUT = 5.0  # Seconds FFmpeg may spend connecting to a stream
+READ_TIMEOUT = 5.0  # Seconds without a frame before a stream counts as lost
+RECONNECT_MIN_DELAY = 1.0  # First retry delay; doubles with each failure in a row
+RECONNECT_MAX_DELAY = 30.0
+
+
+def parse_seconds(value, default):
+    """Positive number of seconds from a camera.csv cell, else ``default``."""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return default
+    return seconds if seconds > 0 else default
+
+
+def reconnect_delay(failures):
+    """Jittered exponential backoff, so cameras behind one NVR do not retry in lockstep."""
+    delay = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * 2 ** max(0, failures - 1))
+    return random.uniform(delay / 2, delay)
+
+
+def open_capture(source, open_timeout=OPEN_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """Open a cv2.VideoCapture with the settings used for every stream."""
+    params = []
+    if not isinstance(source, int) and hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC"):
+        params = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(open_timeout * 1000),
+                  cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(read_timeout * 1000)]
+    cap = cv2.VideoCapture(source, cv2.CAP_ANY, params) if params else cv2.VideoCapture(source)
+    if not cap.isOpened():
+        cap.release()
+        raise ConnectionError("Failed to open stream")
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class FrameGrabber:
+    """Dedicated thread that drains one camera and keeps only its newest frame.
+
+    The stream is read as fast as it delivers, so nothing queues up inside
+    the decoder however slowly frames are consumed. The latest frame sits
+    in a single slot with a sequence number; ``latest()`` returns it without
+    blocking and consumers skip frames they have already seen. Opening and
+    reconnecting happen on the grab thread only, bounded by the open and
+    read timeouts, so every camera connects in parallel and has at most one
+    reconnect in flight. ``on_frame(sequence, frame)``, if given, is called
+    from the grab thread for every new frame. ``capture`` selects another
+    decoder, e.g. ``ffmpeg_capture.FFmpegSettings``; its ``open(source,
+    open_timeout, read_timeout)`` must return a VideoCapture-like object.
+    """
+
+    def __init__(self, source, name=None, opener=open_capture, on_frame=None,
+                 open_timeout=OPEN_TIMEOUT, read_timeout=READ_TIMEOUT, capture=None):
+        self.source = source
+        self.name = name or str(source)
+        self.opener = opener
+        self.on_frame = on_frame
+        self.open_timeout = open_timeout
+        self.read_timeout = read_timeout
+        self.capture = capture
+        self.connected = False
+        self.error = None
+        self.failures = 0  # Failed connections in a row
+        self._lock = threading.Lock()
+        self._frame = None
+        self._sequence = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"grab-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=False):
+        self._stop_event.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self):
+        """Return ``(sequence, frame)`` for the newest frame; sequence 0 means none yet.
+
+        The frame is shared with every consumer and is read-only.
+        """
+        with self._lock:
+            return self._sequence, self._frame
+
+    def _publish(self, frame):
+        frame.flags.writeable = False  # Shared by every consumer
+        with self._lock:
+            self._frame = frame
+            self._sequence += 1
+            sequence = self._sequence
+        if self.on_frame is not None:
+            try:
+                self.on_frame(sequence, frame)
+            except Exception as e:
+                logging.error(f"Frame handler error ({self.name}): {e}")
+
+    def _open(self):
+        if self.capture is not None:
+            return self.capture.open(self.source, self.open_timeout, self.read_timeout)
+        if self.opener is open_capture:
+            return open_capture(self.source, self.open_timeout, self.read_timeout)
+        return self.opener(self.source)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                cap = self._open()
+            except Exception as e:
+                self.connected, self.error = False, str(e)
+                self.failures += 1
+                delay = reconnect_delay(self.failures)
+                logging.error(f"Connection error ({self.name}): {e}, retrying in {delay:.1f}s")
+                self._stop_event.wait(delay)
+                continue
+
+            self.connected, self.error = True, None
+            try:
+                while not self._stop_event.is_set():
+                    ret, frame = cap.read()
+                    if not ret:
+                        self.error = "Stream ended"
+                        break
+                    self.failures = 0
+                    self._publish(frame)
+            finally:
+                cap.release()
+                self.connected = False
+            if not self._stop_event.is_set():
+                self.failures += 1
+                delay = reconnect_delay(self.failures)
+                logging.warning(f"Lost stream {self.name}, reconnecting in {delay:.1f}s")
+                self._stop_event.wait(delay)
@@ -0,0 +1,209 @@
+import numpy as np
+
+# Defaults used by cv2.face.LBPHFaceRecognizer_create()
+DEFAULT_RADIUS = 1
+DEFAULT_NEIGHBORS = 8
+DEFAULT_GRID_X = 8
+DEFAULT_GRID_Y = 8
+
+# Number of histogram bins scored per block; keeps the working set cache-sized
+SCORE_BLOCK_BINS = 32
+
+# Images turned into LBP codes at once; bounds memory for large training sets
+HISTOGRAM_BATCH = 64
+
+FLT_EPSILON = np.finfo(np.float32).eps
+
+# What LBPHFaceRecognizer.predict returns when no histogram is within threshold
+NO_MATCH = (-1, float(np.finfo(np.float64).max))
+
+
+class LBPHEngine:
+    """NumPy re-implementation of OpenCV's LBPH face recognizer.
+
+    All training histograms live in one contiguous float32 matrix so a whole
+    batch of face crops can be scored at once instead of calling
+    ``LBPHFaceRecognizer.predict`` per face. Labels and distances match the
+    OpenCV model (chi-square "alt" distance, nearest neighbour).
+
+    The matrix is stored bin-major (bins x histograms). A query only has to be
+    compared on the bins it actually uses, because the chi-square distance
+    can be rewritten as ``2 * (sum(h) + sum(q) - 4 * sum(h * q / (h + q)))``
+    and the last sum vanishes wherever ``q`` is zero.
+    """
+
+    def __init__(self, radius=DEFAULT_RADIUS, neighbors=DEFAULT_NEIGHBORS,
+                 grid_x=DEFAULT_GRID_X, grid_y=DEFAULT_GRID_Y, threshold=np.inf):
+        self.radius = int(radius)
+        self.neighbors = int(neighbors)
+        self.grid_x = int(grid_x)
+        self.grid_y = int(grid_y)
+        self.threshold = float(threshold)
+        self.num_patterns = 2 ** self.neighbors
+        self.labels = np.zeros(0, np.int32)
+        self._by_bin = np.zeros((self.num_bins, 0), np.float32)
+        self._row_sums = np.zeros(0, np.float64)
+        self._offsets = self._sample_offsets()
+
+    @classmethod
+    def from_recognizer(cls, recognizer):
+        """Build an engine holding the histograms of a trained cv2 LBPH model."""
+        engine = cls(recognizer.getRadius(), recognizer.getNeighbors(),
+                     recognizer.getGridX(), recognizer.getGridY(),
+                     recognizer.getThreshold())
+        histograms = recognizer.getHistograms()
+        if histograms:
+            engine.set_model(np.vstack([h.reshape(1, -1) for h in histograms]),
+                             recognizer.getLabels())
+        return engine
+
+    @property
+    def num_bins(self):
+        return self.grid_x * self.grid_y * self.num_patterns
+
+    @property
+    def empty(self):
+        return len(self.labels) == 0
+
+    @property
+    def histograms(self):
+        """Training histograms as an (N x bins) view."""
+        return self._by_bin.T
+
+    def set_model(self, histograms, labels):
+        """Replace the training histograms (N x bins) and their labels."""
+        histograms = np.asarray(histograms, dtype=np.float32)
+        if histograms.ndim != 2:
+            raise ValueError("Histogram matrix must be two-dimensional.")
+        self.set_bin_major(np.ascontiguousarray(histograms.T), labels)
+
+    def set_bin_major(self, by_bin, labels):
+        """Replace the model with a (bins x N) float32 matrix, used without copying."""
+        labels = np.ascontiguousarray(labels, dtype=np.int32).reshape(-1)
+        if by_bin.dtype != np.float32 or not by_bin.flags.c_contiguous:
+            by_bin = np.ascontiguousarray(by_bin, dtype=np.float32)
+        if by_bin.ndim != 2 or by_bin.shape[1] != labels.shape[0]:
+            raise ValueError("Histogram matrix and label array do not match.")
+        if by_bin.shape[0] != self.num_bins:
+            raise ValueError("Histogram length does not match the LBPH parameters.")
+        self._by_bin = by_bin
+        self._row_sums = by_bin.sum(axis=0, dtype=np.float64)
+        self.labels = labels
+
+    def _sample_offsets(self):
+        """Bilinear sampling offsets and weights, computed exactly like OpenCV's elbp."""
+        offsets = []
+        for n in range(self.neighbors):
+            angle = 2.0 * np.pi * n / float(np.float32(self.neighbors))
+            x = np.float32(self.radius * np.cos(angle))
+            y = np.float32(-self.radius * np.sin(angle))
+            fx, fy = int(np.floor(x)), int(np.floor(y))
+            cx, cy = int(np.ceil(x)), int(np.ceil(y))
+            tx, ty = np.float32(x - fx), np.float32(y - fy)
+            one = np.float32(1)
+            weights = ((one - tx) * (one - ty), tx * (one - ty), (one - tx) * ty, tx * ty)
+            offsets.append((fx, fy, cx, cy, weights))
+        return offsets
+
+    def lbp_codes(self, images):
+        """Extended LBP codes for a (batch, height, width) stack of grayscale images."""
+        src = np.asarray(images, dtype=np.float32)
+        r = self.radius
+        _, rows, cols = src.shape
+        if rows <= 2 * r or cols <= 2 * r:
+            raise ValueError("Face crops are too small for the LBP radius.")
+        center = src[:, r:rows - r, r:cols - r]
+        codes = np.zeros(center.shape, np.int32)
+
+        def shifted(dx, dy):
+            return src[:, r + dy:rows - r + dy, r + dx:cols - r + dx]
+
+        for n, (fx, fy, cx, cy, (w1, w2, w3, w4)) in enumerate(self._offsets):
+            t = w1 * shifted(fx, fy)
+            t += w2 * shifted(cx, fy)
+            t += w3 * shifted(fx, cy)
+            t += w4 * shifted(cx, cy)
+            bit = (t > center) | (np.abs(t - center) < FLT_EPSILON)
+            codes |= bit.astype(np.int32) << n
+        return codes
+
+    def spatial_histograms(self, images):
+        """Normalised grid histograms (batch x bins) for a stack of equally sized images."""
+        codes = self.lbp_codes(images)
+        batch, rows, cols = codes.shape
+        cell_h, cell_w = rows // self.grid_y, cols // self.grid_x
+        if cell_h == 0 or cell_w == 0:
+            raise ValueError("Face crops are too small for the LBPH grid.")
+
+        cells = codes[:, :cell_h * self.grid_y, :cell_w * self.grid_x]
+        cells = cells.reshape(batch, self.grid_y, cell_h, self.grid_x, cell_w)
+        cell_index = (np.arange(batch).reshape(-1, 1, 1, 1, 1) * self.grid_y
+                      + np.arange(self.grid_y).reshape(1, -1, 1, 1, 1)) * self.grid_x \
+            + np.arange(self.grid_x).reshape(1, 1, 1, -1, 1)
+        bins = cell_index * self.num_patterns + cells
+
+        counts = np.bincount(bins.ravel(), minlength=batch * self.num_bins)
+        hist = counts.astype(np.float32) * np.float32(1.0 / (cell_h * cell_w))
+        return hist.reshape(batch, self.num_bins)
+
+    def compute_histograms(self, images):
+        """Grid histograms for a list of grayscale images of any (mixed) sizes."""
+        images = [np.asarray(img) for img in images]
+        result = np.zeros((len(images), self.num_bins), np.float32)
+        by_shape = {}
+        for i, img in enumerate(images):
+            by_shape.setdefault(img.shape, []).append(i)
+        for indices in by_shape.values():
+            for start in range(0, len(indices), HISTOGRAM_BATCH):
+                batch = indices[start:start + HISTOGRAM_BATCH]
+                result[batch] = self.spatial_histograms(np.stack([images[i] for i in batch]))
+        return result
+
+    def distances(self, queries):
+        """Chi-square (alt) distance of every query histogram to every training histogram."""
+        queries = np.asarray(queries, dtype=np.float32)
+        count = len(self.labels)
+        result = np.empty((len(queries), count), np.float64)
+        if count == 0:
+            return result
+
+        block = np.empty((SCORE_BLOCK_BINS, count), np.float32)
+        total = np.empty((SCORE_BLOCK_BINS, count), np.float32)
+        for i, query in enumerate(queries):
+            bins = np.flatnonzero(query)
+            values = query[bins]
+            overlap = np.zeros(count, np.float64)
+            for start in range(0, len(bins), SCORE_BLOCK_BINS):
+                rows = bins[start:start + SCORE_BLOCK_BINS]
+                q = values[start:start + SCORE_BLOCK_BINS, None]
+                h, t = block[:len(rows)], total[:len(rows)]
+                np.take(self._by_bin, rows, axis=0, out=h)
+                np.add(h, q, out=t)
+                h *= q
+                h /= t
+                overlap += h.sum(axis=0, dtype=np.float64)
+            query_sum = values.sum(dtype=np.float64)
+            result[i] = 2.0 * (self._row_sums + query_sum) - 8.0 * overlap
+        return result
+
+    def predict_histograms(self, queries):
+        """Nearest-neighbour (label, distance) pairs for precomputed query histograms."""
+        dists = self.distances(queries)
+        results = []
+        for row in dists:
+            best = int(np.argmin(row)) if row.size else -1
+            if best >= 0 and row[best] < self.threshold:
+                results.append((int(self.labels[best]), float(row[best])))
+            else:
+                results.append(NO_MATCH)
+        return results
+
+    def predict_batch(self, images):
+        """Predict (label, distance) for every face crop in ``images``."""
+        if len(images) == 0:
+            return []
+        return self.predict_histograms(self.compute_histograms(images))
+
+    def predict(self, image):
+        """Single-crop drop-in replacement for ``LBPHFaceRecognizer.predict``."""
+        return self.predict_batch([image])[0]
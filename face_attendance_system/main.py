@@ -1,8 +1,10 @@
 import sys
 from login import LoginPage
 from PyQt5.QtWidgets import QApplication
+from video_wall import prefer_software_opengl
 
 if __name__ == "__main__":
+    prefer_software_opengl()  # Before the QApplication exists
     app = QApplication(sys.argv)
     login_page = LoginPage()
     login_page.show()  # Standard windowed mode
@@ -0,0 +1,149 @@
+"""Compact a trained LBPH model down to a few medoid histograms per person.
+
+The model written by ``UserDashboard.train_model`` keeps one histogram per
+enrollment frame, so predict time grows with people x frames. Compaction
+clusters each person's histograms (chi-square distance, k-medoids) and keeps
+only the medoids, making predict time grow with the number of people.
+
+Usage:
+    python model_compaction.py --prototypes 8 --holdout 0.2
+"""
+import argparse
+import time
+import numpy as np
+
+from lbph_engine import LBPHEngine
+from model_store import save_binary_model
+from utils.constants import TRAINED_MODEL_PATH
+from training import DATA_PATH, load_training_set, save_label_names, write_lbph_model
+
+PROTOTYPES_PER_PERSON = 8
+COMPACT_MODEL_PATH = "models/trained_model_compact.yml"
+
+
+def pairwise_distances(engine, histograms):
+    """Chi-square distances between all pairs of ``histograms``."""
+    scratch = LBPHEngine(engine.radius, engine.neighbors, engine.grid_x, engine.grid_y)
+    scratch.set_model(histograms, np.zeros(len(histograms), np.int32))
+    return scratch.distances(histograms)
+
+
+def k_medoids(dist, k, max_iter=50):
+    """Indices of ``k`` medoids for a square distance matrix (PAM build + alternate)."""
+    n = len(dist)
+    if n <= k:
+        return np.arange(n)
+
+    # Greedy build: start from the overall medoid, then add the point that
+    # lowers the total distance to the nearest medoid the most.
+    medoids = [int(np.argmin(dist.sum(axis=1)))]
+    nearest = dist[:, medoids[0]].copy()
+    while len(medoids) < k:
+        gains = np.maximum(nearest[:, None] - dist, 0).sum(axis=0)
+        gains[medoids] = -1
+        best = int(np.argmax(gains))
+        medoids.append(best)
+        nearest = np.minimum(nearest, dist[:, best])
+
+    medoids = np.array(medoids)
+    for _ in range(max_iter):
+        assignment = np.argmin(dist[:, medoids], axis=1)
+        updated = medoids.copy()
+        for cluster in range(k):
+            members = np.flatnonzero(assignment == cluster)
+            if len(members):
+                within = dist[np.ix_(members, members)].sum(axis=1)
+                updated[cluster] = members[np.argmin(within)]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+    return medoids
+
+
+def compact_engine(engine, prototypes_per_person=PROTOTYPES_PER_PERSON):
+    """Return a new engine that keeps at most ``prototypes_per_person`` medoids per label."""
+    histograms = engine.histograms
+    keep = []
+    for label in np.unique(engine.labels):
+        rows = np.flatnonzero(engine.labels == label)
+        dist = pairwise_distances(engine, histograms[rows])
+        keep.extend(rows[k_medoids(dist, prototypes_per_person)])
+    keep = np.sort(np.array(keep, dtype=np.int64))
+
+    compact = LBPHEngine(engine.radius, engine.neighbors, engine.grid_x, engine.grid_y, engine.threshold)
+    compact.set_model(histograms[keep], engine.labels[keep])
+    return compact
+
+
+def holdout_split(labels, fraction, seed=0):
+    """Split sample indices per person into (train, holdout) index arrays."""
+    rng = np.random.default_rng(seed)
+    labels = np.asarray(labels)
+    train, holdout = [], []
+    for label in np.unique(labels):
+        rows = rng.permutation(np.flatnonzero(labels == label))
+        count = int(round(len(rows) * fraction))
+        if len(rows) - count < 1:
+            count = len(rows) - 1
+        holdout.extend(rows[:count])
+        train.extend(rows[count:])
+    return np.sort(train), np.sort(holdout)
+
+
+def evaluate(engine, images, labels):
+    """Return (accuracy, mean per-face predict latency in ms) on ``images``."""
+    if not images:
+        return 0.0, 0.0
+    correct = 0
+    start = time.perf_counter()
+    for image, label in zip(images, labels):
+        predicted, _ = engine.predict(image)
+        correct += predicted == label
+    elapsed = time.perf_counter() - start
+    return correct / len(images), elapsed * 1000.0 / len(images)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the trained LBPH model to medoid prototypes.")
+    parser.add_argument("--data", default=DATA_PATH, help="training images folder")
+    parser.add_argument("--prototypes", type=int, default=PROTOTYPES_PER_PERSON,
+                        help="histograms kept per person")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="fraction of each person's images held out for evaluation")
+    parser.add_argument("--output", default=COMPACT_MODEL_PATH, help="where to write the compact model")
+    parser.add_argument("--replace", action="store_true",
+                        help="also replace the live model (YAML and binary) with the compact model")
+    args = parser.parse_args()
+
+    images, labels, label_map = load_training_set(args.data)
+    labels = np.array(labels, dtype=np.int32)
+    engine = LBPHEngine()
+    histograms = engine.compute_histograms(images)
+
+    train, holdout = holdout_split(labels, args.holdout)
+    full = LBPHEngine()
+    full.set_model(histograms[train], labels[train])
+    compact = compact_engine(full, args.prototypes)
+    test_images = [images[i] for i in holdout]
+    test_labels = labels[holdout]
+
+    full_acc, full_ms = evaluate(full, test_images, test_labels)
+    compact_acc, compact_ms = evaluate(compact, test_images, test_labels)
+    print(f"Held-out faces: {len(test_images)} ({len(label_map)} people)")
+    print(f"{'model':<10}{'histograms':>12}{'accuracy':>12}{'ms/face':>10}")
+    print(f"{'full':<10}{len(full.labels):>12}{full_acc:>12.2%}{full_ms:>10.2f}")
+    print(f"{'compact':<10}{len(compact.labels):>12}{compact_acc:>12.2%}{compact_ms:>10.2f}")
+
+    # The saved model is compacted from every image, not just the training split
+    engine.set_model(histograms, labels)
+    final = compact_engine(engine, args.prototypes)
+    write_lbph_model(final, args.output)
+    save_label_names(label_map)
+    if args.replace:
+        write_lbph_model(final, TRAINED_MODEL_PATH)
+        save_binary_model(final, label_map)
+    print(f"Compact model with {len(final.labels)} histograms written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import threading
+import logging
+import cv2
+
+from lbph_engine import LBPHEngine
+from model_store import model_signature, load_model_files
+
+# Local copy shipped with the app, falling back to the one bundled with OpenCV
+CASCADE_PATH = "models/haarcascade_frontalface_default.xml"
+CASCADE_NAME = "haarcascade_frontalface_default.xml"
+POLL_INTERVAL = 2.0  # Seconds between checks for a retrained model
+
+
+def cascade_file(path=CASCADE_PATH):
+    """Path of the face cascade XML to load."""
+    return path if os.path.exists(path) else cv2.data.haarcascades + CASCADE_NAME
+
+
+class ModelVersion:
+    """Immutable snapshot of one loaded model.
+
+    Consumers take a snapshot once per frame, so a reload can never mix the
+    histograms of one model with the label names of another.
+    """
+
+    def __init__(self, version, engine, label_names, signature=None):
+        self.version = version
+        self.engine = engine
+        self.label_names = label_names
+        self.signature = signature
+
+    @property
+    def empty(self):
+        return self.engine.empty
+
+    def name_for(self, label_id):
+        return self.label_names.get(label_id, "Unknown")
+
+
+class ModelRegistry:
+    """Process-wide owner of the face cascade, recognizer and label map.
+
+    A background watcher reloads the model when training publishes a new
+    one (model_store's CURRENT pointer names another model directory) and
+    swaps it in with a single reference assignment, so running streams
+    pick it up on their next frame without restarting or waiting on I/O.
+    """
+
+    def __init__(self, cascade_path=CASCADE_PATH, poll_interval=POLL_INTERVAL):
+        self.cascade_path = cascade_file(cascade_path)
+        self.poll_interval = poll_interval
+        self._current = ModelVersion(0, LBPHEngine(), {})
+        self._reload_lock = threading.Lock()
+        self._thread_state = threading.local()
+        self._stop_event = threading.Event()
+        self._watcher = None
+
+    def current(self):
+        """Return the active ModelVersion."""
+        return self._current
+
+    def face_cascade(self):
+        """Return the face cascade for the calling thread.
+
+        ``CascadeClassifier.detectMultiScale`` is not safe to call on one
+        instance from several threads, so each thread gets its own copy,
+        loaded once and reused for every stream served by that thread.
+        """
+        cascade = getattr(self._thread_state, "face_cascade", None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(self.cascade_path)
+            if cascade.empty():
+                raise FileNotFoundError("Haarcascade file not found or corrupted.")
+            self._thread_state.face_cascade = cascade
+        return cascade
+
+    def reload(self, force=False):
+        """Load the model on disk if it differs from the active one.
+
+        Returns True when a new version was swapped in. A failed load keeps
+        the previous version active.
+        """
+        with self._reload_lock:
+            signature = model_signature()
+            if signature is None or (not force and signature == self._current.signature):
+                return False
+            try:
+                engine, label_names = load_model_files(signature)
+            except Exception as e:
+                logging.error(f"Model reload failed, keeping version {self._current.version}: {e}")
+                return False
+            self._current = ModelVersion(self._current.version + 1, engine, label_names, signature)
+            logging.info(f"Loaded face model version {self._current.version} "
+                         f"({len(engine.labels)} histograms, {len(label_names)} people)")
+            return True
+
+    def start_watching(self):
+        """Poll for new model files in a daemon thread."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_event.set()
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self.reload()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Return the process-wide ModelRegistry, loading the model on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+            _registry.reload()
+            _registry.start_watching()
+        return _registry
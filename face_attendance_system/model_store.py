@@ -0,0 +1,195 @@
+"""Binary, memory-mappable storage for the LBPH model.
+
+The YAML written by ``LBPHFaceRecognizer.write`` stores every histogram as
+text and takes seconds to parse once a few dozen people are enrolled. The
+binary layout is a directory holding one subdirectory per saved model:
+
+    histograms.npy  float32 (bins x N) matrix, bin-major as used by LBPHEngine
+    labels.npy      int32 label of each histogram
+    model.json      LBPH parameters and the label -> person name table
+
+and a CURRENT file naming the active one. A model is written in full to a
+new subdirectory and then published by replacing CURRENT, so readers never
+see half a model and no file that may be memory-mapped is ever
+overwritten (which Windows refuses). ``load_binary_model`` memory-maps
+``histograms.npy`` read-only, so every camera worker in a process (and
+across processes) shares the same pages.
+
+Usage:
+    python model_store.py    # convert models/trained_model.yml + label_names.pkl
+"""
+import argparse
+import json
+import os
+import time
+import pickle
+import shutil
+import tempfile
+import cv2
+import numpy as np
+
+from lbph_engine import LBPHEngine
+from utils.constants import TRAINED_MODEL_PATH, LABEL_NAMES_PATH, BINARY_MODEL_DIR
+
+HISTOGRAMS_FILE = "histograms.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "model.json"
+POINTER_FILE = "CURRENT"
+VERSION_PREFIX = "model-"
+KEEP_VERSIONS = 2  # The active model and the one before it, which running processes may still map
+FORMAT_VERSION = 1
+MODEL_FILES = (HISTOGRAMS_FILE, LABELS_FILE, META_FILE)
+
+
+def current_model_dir(directory=BINARY_MODEL_DIR):
+    """Directory holding the active model files, or None if there is no model.
+
+    Follows the CURRENT pointer; ``directory`` may also be a model
+    directory itself, or hold the files directly as older versions did.
+    """
+    try:
+        with open(os.path.join(directory, POINTER_FILE), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        name = ""
+    path = os.path.join(directory, name) if name else directory
+    if all(os.path.exists(os.path.join(path, file)) for file in MODEL_FILES):
+        return path
+    return None
+
+
+def binary_model_exists(directory=BINARY_MODEL_DIR):
+    return current_model_dir(directory) is not None
+
+
+def _replace_with(path, write):
+    """Write a file next to ``path`` and move it into place atomically."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _prune_versions(directory, current):
+    """Delete model directories older than the last KEEP_VERSIONS, and files of the flat layout."""
+    versions = sorted(name for name in os.listdir(directory)
+                      if name.startswith(VERSION_PREFIX) and os.path.isdir(os.path.join(directory, name)))
+    old = [name for name in versions[:-KEEP_VERSIONS] if name != current]
+    for name in old:
+        # A model still mapped on Windows cannot be deleted yet; the next save retries
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    for name in MODEL_FILES:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def save_binary_model(engine, label_names, directory=BINARY_MODEL_DIR):
+    """Write ``engine`` and its label names as a new model and make it the active one."""
+    os.makedirs(directory, exist_ok=True)
+    meta = {
+        "format": FORMAT_VERSION,
+        "radius": engine.radius,
+        "neighbors": engine.neighbors,
+        "grid_x": engine.grid_x,
+        "grid_y": engine.grid_y,
+        "threshold": min(engine.threshold, np.finfo(np.float64).max),
+        "count": int(len(engine.labels)),
+        "label_names": {str(label): name for label, name in label_names.items()},
+    }
+    # Names sort by save time; the random suffix keeps concurrent saves apart
+    path = tempfile.mkdtemp(prefix=f"{VERSION_PREFIX}{time.time_ns():020d}-", dir=directory)
+    np.save(os.path.join(path, HISTOGRAMS_FILE), np.ascontiguousarray(engine.histograms.T))
+    np.save(os.path.join(path, LABELS_FILE), engine.labels)
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    # Publishing is one atomic replace of the pointer
+    name = os.path.basename(path)
+    _replace_with(os.path.join(directory, POINTER_FILE), lambda f: f.write(name.encode("utf-8")))
+    _prune_versions(directory, name)
+
+
+def load_binary_model(directory=BINARY_MODEL_DIR, mmap=True):
+    """Load ``(engine, label_names)`` of the active model in the binary layout."""
+    path = current_model_dir(directory)
+    if path is None:
+        raise FileNotFoundError(f"No binary model in '{directory}'.")
+    with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary model format: {meta.get('format')}")
+
+    by_bin = np.load(os.path.join(path, HISTOGRAMS_FILE), mmap_mode="r" if mmap else None)
+    labels = np.load(os.path.join(path, LABELS_FILE))
+    if by_bin.shape[1] != meta["count"] or len(labels) != meta["count"]:
+        raise ValueError("Binary model files are out of sync; retrain or reconvert the model.")
+
+    engine = LBPHEngine(meta["radius"], meta["neighbors"], meta["grid_x"], meta["grid_y"], meta["threshold"])
+    engine.set_bin_major(by_bin, labels)
+    label_names = {int(label): name for label, name in meta["label_names"].items()}
+    return engine, label_names
+
+
+def convert_yml_model(model_path=TRAINED_MODEL_PATH, label_names_path=LABEL_NAMES_PATH,
+                      directory=BINARY_MODEL_DIR):
+    """Convert an LBPH YAML model and its label pickle to the binary layout."""
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Trained model file '{model_path}' not found.")
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(model_path)
+    engine = LBPHEngine.from_recognizer(recognizer)
+
+    label_names = {}
+    if os.path.exists(label_names_path):
+        with open(label_names_path, "rb") as f:
+            label_names = pickle.load(f)
+    save_binary_model(engine, label_names, directory)
+    return engine, label_names
+
+
+def model_signature(model_path=TRAINED_MODEL_PATH, directory=BINARY_MODEL_DIR):
+    """Identify the model currently on disk by path and modification time.
+
+    Returns ``None`` when no trained model exists yet. The published binary
+    model always wins, since it carries its own label names; the YAML file
+    and its label pickle are only read when there is no binary model (run
+    this module to convert them).
+    """
+    path = current_model_dir(directory)
+    if path is not None:
+        return ("binary", path, os.stat(os.path.join(path, META_FILE)).st_mtime_ns)
+    if os.path.exists(model_path):
+        return ("yml", model_path, os.stat(model_path).st_mtime_ns)
+    return None
+
+
+def load_model_files(signature, label_names_path=LABEL_NAMES_PATH):
+    """Load ``(engine, label_names)`` for a signature from ``model_signature``."""
+    kind, path, _ = signature
+    if kind == "binary":
+        return load_binary_model(path)
+
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(path)
+    engine = LBPHEngine.from_recognizer(recognizer)
+    if not os.path.exists(label_names_path):
+        raise FileNotFoundError(f"Label names file '{label_names_path}' not found.")
+    with open(label_names_path, "rb") as f:
+        label_names = pickle.load(f)
+    return engine, label_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the LBPH YAML model to the binary format.")
+    parser.add_argument("--model", default=TRAINED_MODEL_PATH, help="LBPH YAML model")
+    parser.add_argument("--labels", default=LABEL_NAMES_PATH, help="label names pickle")
+    parser.add_argument("--output", default=BINARY_MODEL_DIR, help="binary model directory")
+    args = parser.parse_args()
+
+    engine, label_names = convert_yml_model(args.model, args.labels, args.output)
+    print(f"Converted {len(engine.labels)} histograms ({len(label_names)} people) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
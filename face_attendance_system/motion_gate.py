@@ -0,0 +1,68 @@
+import math
+import cv2
+
+MOTION_ADDON = "Motion Detection"
+DEFAULT_MOTION_THRESHOLD = 0.01  # Share of the downscaled frame that has to change
+GATE_WIDTH = 160  # Width the frame is downscaled to before differencing
+BACKGROUND_RATE = 0.05  # Running-average update rate of the background
+PIXEL_DELTA = 25  # Gray-level change for a pixel to count as moving
+HOLD_FRAMES = 15  # Frames analysis keeps running after motion stops
+
+
+def parse_threshold(value, default=DEFAULT_MOTION_THRESHOLD):
+    """Motion threshold from a camera.csv cell, falling back to ``default`` when blank."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if math.isnan(value) or value < 0 else value
+
+
+class MotionGate:
+    """Decides whether a frame is worth running face detection on.
+
+    Keeps a running-average background of a small blurred grayscale copy of
+    the frame and reports motion when more than ``threshold`` of its pixels
+    differ from it. Motion keeps the gate open for HOLD_FRAMES more frames.
+    """
+
+    def __init__(self, threshold=DEFAULT_MOTION_THRESHOLD):
+        self.threshold = threshold
+        self.motion_ratio = 0.0
+        self._background = None
+        self._hold = 0
+
+    def reset(self):
+        self._background = None
+        self._hold = 0
+
+    def update(self, gray, context=None):
+        """Feed a grayscale frame; return True if it should be analysed.
+
+        With the frame's FrameContext the downscaled copy is shared with the detector.
+        """
+        height, width = gray.shape[:2]
+        scale = GATE_WIDTH / width if width > GATE_WIDTH else 1.0
+        if context is not None:
+            small = context.scaled_gray(scale)
+        else:
+            small = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+
+        if self._background is None or self._background.shape != small.shape:
+            self._background = small.astype("float32")
+            self._hold = HOLD_FRAMES
+            return True
+
+        diff = cv2.absdiff(small, cv2.convertScaleAbs(self._background))
+        self.motion_ratio = cv2.countNonZero(cv2.threshold(diff, PIXEL_DELTA, 255, cv2.THRESH_BINARY)[1]) / diff.size
+        cv2.accumulateWeighted(small, self._background, BACKGROUND_RATE)
+
+        if self.motion_ratio > self.threshold:
+            self._hold = HOLD_FRAMES
+            return True
+        if self._hold > 0:
+            self._hold -= 1
+            return True
+        return False
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+
+# camera.csv "ROI" cell: polygons separated by ";", points by ",", each point
+# "x y" in 0-1 frame coordinates, e.g. "0.1 0.2, 0.5 0.2, 0.5 0.9; 0.7 0 ..."
+POLYGON_SEPARATOR = ";"
+POINT_SEPARATOR = ","
+ROI_HELP = "Polygons as 'x y, x y, x y; ...' with x and y between 0 and 1. Empty = whole frame."
+
+
+def parse_roi(text):
+    """Polygons from a camera.csv ROI cell; raises ValueError if malformed."""
+    if not isinstance(text, str) or not text.strip():
+        return []
+    polygons = []
+    for part in text.split(POLYGON_SEPARATOR):
+        if not part.strip():
+            continue
+        points = []
+        for point in part.split(POINT_SEPARATOR):
+            coords = point.split()
+            if len(coords) != 2:
+                raise ValueError(f"ROI point '{point.strip()}' must be 'x y'")
+            x, y = float(coords[0]), float(coords[1])
+            if not (0.0 <= x <= 1.0 and 0.0 <= y <= 1.0):
+                raise ValueError(f"ROI point '{point.strip()}' is outside 0-1")
+            points.append((x, y))
+        if len(points) < 3:
+            raise ValueError("An ROI polygon needs at least 3 points")
+        polygons.append(points)
+    return polygons
+
+
+def format_roi(polygons):
+    """camera.csv ROI cell for a list of polygons."""
+    return f"{POLYGON_SEPARATOR} ".join(
+        f"{POINT_SEPARATOR} ".join(f"{x:.4g} {y:.4g}" for x, y in polygon) for polygon in polygons)
+
+
+def merge_rects(rects):
+    """Merge overlapping (x, y, w, h) rectangles until none overlap."""
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                ax, ay, aw, ah = rects[i]
+                bx, by, bw, bh = rects[j]
+                if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                    x, y = min(ax, bx), min(ay, by)
+                    rects[i] = (x, y, max(ax + aw, bx + bw) - x, max(ay + ah, by + bh) - y)
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+
+class RegionMask:
+    """Per-camera detection area made of normalised polygons.
+
+    Detection runs only inside the bounding rectangles of the polygons and
+    faces whose centre falls outside them are dropped. The pixel mask and
+    rectangles are rebuilt only when the frame size changes.
+    """
+
+    def __init__(self, polygons):
+        self.polygons = polygons
+        self._shape = None
+        self._mask = None
+        self._rects = []
+
+    @property
+    def empty(self):
+        return not self.polygons
+
+    def _build(self, shape):
+        height, width = shape[:2]
+        self._mask = np.zeros((height, width), np.uint8)
+        rects = []
+        for polygon in self.polygons:
+            points = np.array([(round(x * (width - 1)), round(y * (height - 1))) for x, y in polygon], np.int32)
+            cv2.fillPoly(self._mask, [points], 255)
+            rects.append(cv2.boundingRect(points))
+        self._rects = merge_rects(rects)
+        self._shape = shape[:2]
+
+    def rects(self, shape):
+        """Pixel bounding rectangles of the ROI for a frame of ``shape``."""
+        if self._shape != shape[:2]:
+            self._build(shape)
+        return self._rects
+
+    def contains(self, box, shape):
+        """True if the centre of an (x, y, w, h) box lies inside the ROI."""
+        if self._shape != shape[:2]:
+            self._build(shape)
+        x, y, w, h = box
+        cx = min(max(int(x + w / 2), 0), shape[1] - 1)
+        cy = min(max(int(y + h / 2), 0), shape[0] - 1)
+        return self._mask[cy, cx] > 0
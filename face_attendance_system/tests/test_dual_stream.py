@@ -0,0 +1,86 @@
+import numpy as np
+
+import dual_stream
+from dual_stream import DualStream, FACE_CHECK_EVERY
+
+
+def test_main_capture_applies_to_analysis_only_main_stream():
+    capture = object()
+    stream = DualStream("rtsp://a/main", "rtsp://a/sub", main_capture=capture, open_timeout=2.0)
+    assert not stream.main_always
+    assert stream.main_options == {"open_timeout": 2.0, "capture": capture}
+    assert stream.options == {"open_timeout": 2.0}
+
+
+def test_main_capture_ignored_when_main_stream_is_shown():
+    for stream in (DualStream("rtsp://a/main", "rtsp://a/sub", main_always=True, main_capture=object()),
+                   DualStream("rtsp://a/main", None, main_capture=object())):
+        assert stream.main_always
+        assert "capture" not in stream.main_options
+
+
+class FakeGrabber:
+    def __init__(self, source):
+        self.source = source
+        self.stopped = False
+
+    def stop(self, linger=True):
+        self.stopped = True
+
+
+class FakeHub:
+    def subscribe(self, source, name="", on_frame=None, **options):
+        return FakeGrabber(source)
+
+
+def open_stream(monkeypatch, motion_addon):
+    monkeypatch.setattr(dual_stream, "get_hub", FakeHub)
+    monkeypatch.setattr(dual_stream, "addon_enabled", lambda name: motion_addon)
+    return DualStream("rtsp://a/main", "rtsp://a/sub").start()
+
+
+def test_main_stream_waits_for_motion_when_addon_enabled(monkeypatch):
+    stream = open_stream(monkeypatch, True)
+    assert stream.display.source == "rtsp://a/sub"
+    assert not stream.main_open
+
+
+class FakeFaceCheck:
+    def __init__(self, faces):
+        self.faces = faces
+        self.calls = 0
+
+    def detect(self, gray):
+        self.calls += 1
+        return np.zeros((self.faces, 4), np.int32)
+
+
+def feed_sub_frames(stream, count):
+    frame = np.zeros((36, 64, 3), np.uint8)
+    for sequence in range(1, count + 1):
+        stream._on_sub_frame(sequence, frame)
+
+
+def test_without_motion_addon_faces_on_substream_open_main_stream(monkeypatch):
+    stream = open_stream(monkeypatch, False)
+    assert stream.motion_gate is None and not stream.main_open
+    stream.face_check = FakeFaceCheck(0)
+    feed_sub_frames(stream, FACE_CHECK_EVERY * 2)
+    assert stream.face_check.calls == 2
+    assert not stream.main_open
+    stream.face_check = FakeFaceCheck(1)
+    feed_sub_frames(stream, FACE_CHECK_EVERY)
+    assert stream.main.source == "rtsp://a/main"
+    # Closed again once idle, like a motion-opened main stream
+    stream._deadline = 0.0
+    assert stream.poll()
+
+
+def test_poll_closes_idle_main_stream(monkeypatch):
+    stream = open_stream(monkeypatch, True)
+    stream.open_main()
+    main = stream.main
+    assert not stream.poll()
+    stream._deadline = 0.0
+    assert stream.poll()
+    assert main.stopped and not stream.main_open
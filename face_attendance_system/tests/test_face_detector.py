@@ -0,0 +1,41 @@
+import os
+import shutil
+import types
+import cv2
+
+import face_detector
+from face_detector import lbp_cascade_file, create_backend
+
+
+def fake_opencv_data(tmp_path, monkeypatch):
+    """An OpenCV layout with haarcascades/ and lbpcascades/ side by side, and no local copy."""
+    haar_dir = tmp_path / "haarcascades"
+    lbp_dir = tmp_path / "lbpcascades"
+    haar_dir.mkdir()
+    lbp_dir.mkdir()
+    # Any cascade XML loads; the real LBP file is not installed by pip wheels
+    shutil.copy(cv2.data.haarcascades + "haarcascade_frontalface_default.xml",
+                lbp_dir / "lbpcascade_frontalface_improved.xml")
+    monkeypatch.setattr(face_detector.cv2, "data", types.SimpleNamespace(haarcascades=str(haar_dir) + os.sep))
+    monkeypatch.setattr(face_detector, "OPENCV_SHARE_DIRS", [])
+    return lbp_dir / "lbpcascade_frontalface_improved.xml"
+
+
+def test_lbp_cascade_found_next_to_haar_cascades(tmp_path, monkeypatch):
+    expected = fake_opencv_data(tmp_path, monkeypatch)
+    assert lbp_cascade_file(str(tmp_path / "missing.xml")) == str(expected)
+    assert create_backend("lbp", path=str(tmp_path / "missing.xml")).path == str(expected)
+
+
+def test_local_lbp_cascade_wins(tmp_path, monkeypatch):
+    fake_opencv_data(tmp_path, monkeypatch)
+    local = tmp_path / "local.xml"
+    local.write_text("")
+    assert lbp_cascade_file(str(local)) == str(local)
+
+
+def test_missing_lbp_cascade_falls_back_to_haar(tmp_path, monkeypatch):
+    monkeypatch.setattr(face_detector, "LBP_CASCADE_NAMES", ("nothing.xml",))
+    monkeypatch.setattr(face_detector, "OPENCV_SHARE_DIRS", [])
+    backend = face_detector.backend_for_camera("lbp", {"lbp": {"path": str(tmp_path / "missing.xml")}})
+    assert backend.path.endswith("haarcascade_frontalface_default.xml")
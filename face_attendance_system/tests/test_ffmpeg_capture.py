@@ -0,0 +1,62 @@
+import sys
+import numpy as np
+import pytest
+
+from ffmpeg_capture import FFmpegCapture, parse_capture_size
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1280x720", (1280, 720)),
+    (" 640 X 360 ", (640, 360)),
+    ("640", (640, None)),
+    (640, (640, None)),
+    (640.0, (640, None)),
+    ("", None),
+    (None, None),
+    (float("nan"), None),
+    ("0x720", None),
+    ("640x", None),
+    ("wide", None),
+    ("1x2x3", None),
+])
+def test_parse_capture_size(value, expected):
+    assert parse_capture_size(value) == expected
+
+
+def fake_ffmpeg(monkeypatch, frames, size=(4, 2)):
+    """Run a Python stand-in for ffmpeg that writes ``frames`` gray frames filled with 1, 2, ..."""
+    script = (f"import sys\n"
+              f"sys.stderr.write('fake decode error\\n'); sys.stderr.flush()\n"
+              f"for i in range({frames}):\n"
+              f"    sys.stdout.buffer.write(bytes([i + 1]) * {size[0] * size[1]})\n")
+    monkeypatch.setattr(FFmpegCapture, "_command", lambda self, *timeouts: [sys.executable, "-c", script])
+    return FFmpegCapture("rtsp://cam/stream", "gray", size)
+
+
+def test_read_returns_frames_that_are_never_overwritten(monkeypatch):
+    cap = fake_ffmpeg(monkeypatch, 5)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    assert [int(frame[0, 0]) for frame in frames] == [1, 2, 3, 4, 5]
+    assert all(frame.shape == (2, 4) for frame in frames)
+
+
+def test_read_into_own_image(monkeypatch):
+    cap = fake_ffmpeg(monkeypatch, 2)
+    image = np.zeros((2, 4), np.uint8)
+    ret, frame = cap.read(image)
+    cap.release()
+    assert ret and frame is image and image.min() == 1
+
+
+def test_ffmpeg_errors_are_logged(monkeypatch, caplog):
+    cap = fake_ffmpeg(monkeypatch, 1)
+    cap.read()
+    cap._stderr_thread.join(timeout=5)
+    cap.release()
+    assert "fake decode error" in caplog.text
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+import pytest
+
+import face_recognition
+import face_tracker
+from face_recognition import FaceRecognition, FACE_SIZE
+from frame_analyzer import FrameAnalyzer
+from lbph_engine import LBPHEngine
+from model_registry import ModelVersion
+
+BOXES = [(40, 60, 120, 150), (300, 200, 90, 80)]
+
+
+class FakeRegistry:
+    def __init__(self, model):
+        self.model = model
+
+    def current(self):
+        return self.model
+
+
+def make_model(frame):
+    # One person per box, trained on normalised crops of it and of a shifted copy
+    engine = LBPHEngine()
+    crops, labels = [], []
+    for label, (x, y, w, h) in enumerate(BOXES):
+        for dx in (0, 4):
+            crops.append(cv2.resize(frame[y:y+h, x+dx:x+dx+w], FACE_SIZE))
+            labels.append(label)
+    engine.set_model(engine.compute_histograms(crops), labels)
+    return ModelVersion(1, engine, {0: "alice", 1: "bob"})
+
+
+def test_analyzer_predicts_like_face_recognition(monkeypatch):
+    rng = np.random.default_rng(0)
+    frame = cv2.GaussianBlur(rng.integers(0, 256, (480, 640), np.uint8), (5, 5), 0)
+    model = make_model(frame)
+    registry = FakeRegistry(model)
+
+    votes = []
+    add_vote = face_tracker.Identity.add_vote
+    monkeypatch.setattr(face_tracker.Identity, "add_vote",
+                        lambda self, label, confidence, box: (votes.append((label, confidence)),
+                                                              add_vote(self, label, confidence, box)))
+    analyzer = FrameAnalyzer({"name": "cam"}, registry)
+    monkeypatch.setattr(analyzer.detector, "detect", lambda gray, context=None: np.array(BOXES))
+    monkeypatch.setattr(analyzer.quality, "accept", lambda crop: True)
+    records = analyzer.analyze(frame)
+    assert [tuple(r) for r in records[["x", "y", "w", "h"]]] == BOXES
+
+    monkeypatch.setattr(face_recognition, "get_registry", lambda: registry)
+    expected = FaceRecognition().predict_crops(frame, BOXES, model)
+    assert [label for label, _ in votes] == [label for label, _ in expected] == [0, 1]
+    assert [c for _, c in votes] == pytest.approx([c for _, c in expected])
@@ -0,0 +1,44 @@
+import numpy as np
+
+from frame_context import FrameContext
+
+
+def make_frame(width=640, height=480):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (height, width, 3), np.uint8)
+
+
+def test_gray_is_converted_once():
+    context = FrameContext(make_frame())
+    assert context.gray is context.gray
+    assert context.gray.shape == (480, 640)
+    gray = context.gray
+    assert FrameContext(gray).gray is gray
+
+
+def test_scaled_gray_is_cached_per_size():
+    context = FrameContext(make_frame())
+    assert context.scaled_gray(1.0) is context.gray
+    half = context.scaled_gray(0.5)
+    assert half.shape == (240, 320)
+    assert context.scaled_gray(0.5) is half
+    quarter = context.scaled_gray(0.25)
+    assert quarter.shape == (120, 160)
+    assert set(context._scaled) == {(320, 240), (160, 120)}
+
+
+def test_display_bgr_fits_and_is_cached():
+    frame = make_frame()
+    context = FrameContext(frame)
+    tile = context.display_bgr(320, 320)
+    assert tile.shape == (240, 320, 3)
+    assert context.display_bgr(320, 320) is tile
+    # A different box with the same fitted size shares the image
+    assert context.display_bgr(320, 300) is tile
+    full = context.display_bgr(640, 480)
+    assert full is not frame and np.array_equal(full, frame)
+
+
+def test_display_bgr_of_gray_frame_is_colour():
+    context = FrameContext(make_frame()[:, :, 0].copy())
+    assert context.display_bgr(320, 240).shape == (240, 320, 3)
@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+import pytest
+
+from lbph_engine import LBPHEngine, NO_MATCH
+
+
+def random_faces(count, size=(100, 100), seed=0):
+    rng = np.random.default_rng(seed)
+    # Smoothed noise, so the LBP codes are not all ties
+    return [cv2.GaussianBlur(rng.integers(0, 256, size, np.uint8), (5, 5), 0) for _ in range(count)]
+
+
+def trained_pair(faces, labels, **params):
+    recognizer = cv2.face.LBPHFaceRecognizer_create(**params)
+    recognizer.train(faces, np.array(labels, np.int32))
+    engine = LBPHEngine(params.get("radius", 1), params.get("neighbors", 8),
+                        params.get("grid_x", 8), params.get("grid_y", 8))
+    engine.set_model(engine.compute_histograms(faces), labels)
+    return recognizer, engine
+
+
+@pytest.mark.parametrize("params", [{}, {"radius": 2, "neighbors": 8, "grid_x": 4, "grid_y": 6}])
+def test_histograms_match_opencv(params):
+    faces = random_faces(6)
+    recognizer, engine = trained_pair(faces, [0, 0, 1, 1, 2, 2], **params)
+    expected = np.vstack([h.reshape(1, -1) for h in recognizer.getHistograms()])
+    np.testing.assert_allclose(engine.histograms, expected, rtol=1e-5, atol=1e-7)
+
+
+def test_predictions_match_opencv():
+    faces = random_faces(8)
+    recognizer, engine = trained_pair(faces, [0, 0, 1, 1, 2, 2, 3, 3])
+    queries = random_faces(5, seed=1) + faces[:2]
+    for query, (label, distance) in zip(queries, engine.predict_batch(queries)):
+        expected_label, expected_distance = recognizer.predict(query)
+        assert label == expected_label
+        # The engine's rewritten chi-square leaves float32 rounding on identical faces
+        assert distance == pytest.approx(expected_distance, rel=1e-4, abs=1e-4)
+
+
+def test_from_recognizer_keeps_model():
+    faces = random_faces(4)
+    recognizer, engine = trained_pair(faces, [5, 5, 7, 7])
+    loaded = LBPHEngine.from_recognizer(recognizer)
+    np.testing.assert_array_equal(loaded.labels, [5, 5, 7, 7])
+    assert loaded.predict(faces[2])[0] == 7
+
+
+def test_threshold_and_empty_model():
+    faces = random_faces(2)
+    engine = LBPHEngine(threshold=1e-3)
+    assert engine.predict(faces[0]) == NO_MATCH
+    engine.set_model(engine.compute_histograms(faces), [0, 1])
+    assert engine.predict(faces[1]) == (1, pytest.approx(0.0, abs=1e-4))
+    assert engine.predict(random_faces(1, seed=3)[0]) == NO_MATCH
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from roi_mask import parse_roi, format_roi, merge_rects, RegionMask
+
+SQUARE = "0 0, 0.5 0, 0.5 0.5, 0 0.5"
+
+
+def test_parse_roi():
+    assert parse_roi("") == []
+    assert parse_roi(None) == []
+    assert parse_roi(f"{SQUARE}; 0.6 0.6, 1 0.6, 1 1") == [
+        [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+        [(0.6, 0.6), (1.0, 0.6), (1.0, 1.0)],
+    ]
+
+
+@pytest.mark.parametrize("text", ["0 0, 1 1", "0 0, 1, 1 1", "0 0, 1.5 0, 1 1", "a b, 0 0, 1 1"])
+def test_parse_roi_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        parse_roi(text)
+
+
+def test_format_roi_round_trips():
+    polygons = parse_roi(f"{SQUARE}; 0.25 0.125, 1 0.6, 0.333333 1")
+    reparsed = parse_roi(format_roi(polygons))
+    assert len(reparsed) == len(polygons)
+    for polygon, again in zip(polygons, reparsed):
+        assert np.allclose(polygon, again, atol=1e-3)
+    assert format_roi([]) == ""
+
+
+def test_merge_rects():
+    assert merge_rects([(0, 0, 10, 10), (5, 5, 10, 10), (30, 30, 5, 5)]) == [(0, 0, 15, 15), (30, 30, 5, 5)]
+
+
+def test_region_mask():
+    mask = RegionMask(parse_roi(SQUARE))
+    shape = (101, 201)
+    assert not mask.empty
+    assert mask.rects(shape) == [(0, 0, 101, 51)]
+    assert mask.contains((10, 10, 20, 20), shape)
+    assert not mask.contains((150, 60, 20, 20), shape)
+    # Rebuilt for another frame size
+    assert mask.rects((11, 21)) == [(0, 0, 11, 6)]
+    assert RegionMask([]).empty
@@ -0,0 +1,125 @@
+import os
+import json
+import shutil
+import cv2
+import numpy as np
+import pytest
+
+import training
+from training import train_model, load_manifest, DATA_PATH, MANIFEST_PATH
+from model_store import load_binary_model
+from utils.constants import TRAINED_MODEL_PATH
+
+
+def fake_preprocess(paths, workers=None, progress=None, cancelled=None):
+    """Use the training images themselves as face crops; detection is not under test."""
+    crops = {path: cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in paths}
+    return crops, {"images": len(paths), "cached": 0, "detected": len(paths), "no_face": 0, "unreadable": 0}
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(training, "preprocess_images", fake_preprocess)
+    return tmp_path
+
+
+def add_images(person, count, start=0):
+    folder = os.path.join(DATA_PATH, person)
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng([start] + [ord(c) for c in person])
+    for i in range(start, start + count):
+        cv2.imwrite(os.path.join(folder, f"{i}.png"), rng.integers(0, 256, (64, 64), np.uint8))
+
+
+def model_people():
+    engine, label_names = load_binary_model()
+    return {name: int(np.sum(engine.labels == label)) for label, name in label_names.items()}
+
+
+def yml_histogram_count():
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(TRAINED_MODEL_PATH)
+    return len(recognizer.getHistograms())
+
+
+def test_full_run(workdir):
+    add_images("alice", 3)
+    add_images("bob", 2)
+    summary = train_model(workers=1)
+    assert summary["mode"] == "full"
+    assert summary["processed"] == 5
+    assert model_people() == {"alice": 3, "bob": 2}
+    assert not os.path.exists(TRAINED_MODEL_PATH)
+
+
+def test_yaml_export_is_opt_in(workdir):
+    add_images("alice", 3)
+    train_model(workers=1, write_yaml=True)
+    assert yml_histogram_count() == 3
+    add_images("bob", 2)
+    train_model(workers=1, write_yaml=True)
+    assert yml_histogram_count() == 5
+    # A run without the export removes the now stale YAML model
+    add_images("carol", 1)
+    train_model(workers=1)
+    assert not os.path.exists(TRAINED_MODEL_PATH)
+
+
+def test_adding_a_person_only_processes_their_images(workdir):
+    add_images("alice", 3)
+    train_model(workers=1)
+    labels_before = load_manifest()["label_names"]
+    add_images("carol", 2)
+    summary = train_model(workers=1)
+    assert summary["mode"] == "incremental"
+    assert summary["processed"] == 2
+    assert summary["rebuilt"] == []
+    assert model_people() == {"alice": 3, "carol": 2}
+    # Existing people keep their labels
+    assert {k: v for k, v in load_manifest()["label_names"].items() if v == "alice"} == labels_before
+
+
+def test_deleting_an_image_rebuilds_that_person(workdir):
+    add_images("alice", 3)
+    add_images("bob", 2)
+    train_model(workers=1)
+    os.remove(os.path.join(DATA_PATH, "alice", "0.png"))
+    summary = train_model(workers=1)
+    assert summary["mode"] == "incremental"
+    assert summary["rebuilt"] == ["alice"]
+    assert summary["processed"] == 2
+    assert model_people() == {"alice": 2, "bob": 2}
+
+
+def test_removing_a_folder_drops_the_person(workdir):
+    add_images("alice", 3)
+    add_images("bob", 2)
+    train_model(workers=1)
+    shutil.rmtree(os.path.join(DATA_PATH, "bob"))
+    summary = train_model(workers=1)
+    assert summary["mode"] == "incremental"
+    assert summary["processed"] == 0
+    assert model_people() == {"alice": 3}
+    assert "bob" not in load_manifest()["label_names"].values()
+
+
+def test_unchanged_images_are_not_processed_again(workdir):
+    add_images("alice", 3)
+    train_model(workers=1)
+    summary = train_model(workers=1)
+    assert summary["mode"] == "incremental"
+    assert summary["processed"] == 0
+    assert model_people() == {"alice": 3}
+
+
+def test_preprocessing_change_forces_full_run(workdir):
+    add_images("alice", 3)
+    train_model(workers=1)
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["preprocess_version"] = "old"
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    assert train_model(workers=1)["mode"] == "full"
+    assert load_manifest()["preprocess_version"] == training.PREPROCESS_VERSION
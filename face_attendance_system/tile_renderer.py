@@ -0,0 +1,36 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtGui import QImage
+
+RENDER_THREADS = max(2, min(4, os.cpu_count() or 1))  # OpenCV drops the GIL while resizing
+
+
+class RenderedTile:
+    """A ready-to-blit tile image; keeps the pixels the QImage points into alive."""
+
+    def __init__(self, bgr):
+        self.pixels = bgr
+        height, width = bgr.shape[:2]
+        self.image = QImage(bgr.data, width, height, bgr.strides[0], QImage.Format_BGR888)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_render_executor():
+    """Return the process-wide thread pool that renders camera tiles."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=RENDER_THREADS, thread_name_prefix="render")
+        return _executor
+
+
+def shutdown_render_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,6 @@
-from PyQt5.QtWidgets import QWidget, QPushButton, QVBoxLayout, QMessageBox
-from face_recognition import train_faces
+from PyQt5.QtWidgets import QWidget, QPushButton, QVBoxLayout, QMessageBox, QLabel
+from training import format_summary
+from training_job import TrainingJob
 
 class TrainModelScreen(QWidget):
     def __init__(self):
@@ -11,8 +12,42 @@ class TrainModelScreen(QWidget):
         self.train_btn.clicked.connect(self.train_model)
         layout.addWidget(self.train_btn)
 
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
         self.setLayout(layout)
+        self.job = None
 
     def train_model(self):
-        train_faces()
+        if self.job is not None and self.job.isRunning():
+            self.job.cancel()
+            self.train_btn.setEnabled(False)
+            return
+
+        self.job = TrainingJob(parent=self)
+        self.job.progress.connect(
+            lambda stage, done, total: self.status_label.setText(f"{stage}: {done}/{total}"))
+        self.job.completed.connect(self.training_complete)
+        self.job.failed.connect(self.training_failed)
+        self.job.cancelled.connect(lambda: self.reset("Training cancelled"))
+        self.train_btn.setText("Cancel Training")
+        self.job.start()
+
+    def training_complete(self, summary):
+        self.reset("\n".join(format_summary(summary)))
         QMessageBox.information(self, "Training Complete", "Face Recognition Model Trained Successfully")
+
+    def training_failed(self, message):
+        self.reset(message)
+        QMessageBox.critical(self, "Training Failed", message)
+
+    def reset(self, status):
+        self.train_btn.setText("Start Training")
+        self.train_btn.setEnabled(True)
+        self.status_label.setText(status)
+
+    def closeEvent(self, event):
+        if self.job is not None and self.job.isRunning():
+            self.job.cancel()
+            self.job.wait()
+        event.accept()
@@ -0,0 +1,316 @@
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import argparse
+import cv2
+import numpy as np
+
+from lbph_engine import LBPHEngine
+from face_preprocess import preprocess_images, PREPROCESS_VERSION
+from model_store import binary_model_exists, load_binary_model, save_binary_model
+from utils.constants import TRAINED_MODEL_PATH, LABEL_NAMES_PATH, BINARY_MODEL_DIR
+
+DATA_PATH = "data/training_images"
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')
+MANIFEST_PATH = "models/training_manifest.json"
+HISTOGRAM_CHUNK = 64  # Crops turned into histograms per step
+
+
+def list_person_folders(data_path=DATA_PATH):
+    """Return the person folders under the training directory in a stable order."""
+    if not os.path.exists(data_path):
+        raise FileNotFoundError("Training images folder not found!")
+    return sorted(d for d in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, d)))
+
+
+def list_person_images(person_path):
+    """Return the image paths of one person folder in a stable order."""
+    return [os.path.join(person_path, f) for f in sorted(os.listdir(person_path))
+            if f.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def load_training_set(data_path=DATA_PATH, workers=None, progress=None):
+    """Read the face crop of every training image.
+
+    Returns ``(images, labels, label_map)`` where ``label_map`` maps the
+    integer label to the person folder name. Images without a detectable
+    face are left out.
+    """
+    person_folders = list_person_folders(data_path)
+    if not person_folders:
+        raise ValueError("No person folders found!")
+
+    label_map = {}
+    paths, path_labels = [], []
+    for label, person in enumerate(person_folders):
+        label_map[label] = person
+        for img_path in list_person_images(os.path.join(data_path, person)):
+            paths.append(img_path)
+            path_labels.append(label)
+
+    crops, _ = preprocess_images(paths, workers=workers, progress=progress)
+    images, labels = [], []
+    for img_path, label in zip(paths, path_labels):
+        if crops.get(img_path) is not None:
+            images.append(crops[img_path])
+            labels.append(label)
+    return images, labels, label_map
+
+
+def save_label_names(label_map, path=LABEL_NAMES_PATH):
+    """Write the label -> person name table read by FaceRecognition."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(label_map, f)
+    os.replace(tmp_path, path)
+
+
+def write_lbph_model(engine, path=TRAINED_MODEL_PATH):
+    """Write an LBPHEngine in the YAML layout of ``LBPHFaceRecognizer.write``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # FileStorage picks the format from the extension, so keep ".yml" last
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+    fs = cv2.FileStorage(tmp_path, cv2.FILE_STORAGE_WRITE)
+    try:
+        fs.startWriteStruct("opencv_lbphfaces", cv2.FileNode_MAP)
+        fs.write("threshold", min(engine.threshold, np.finfo(np.float64).max))
+        fs.write("radius", engine.radius)
+        fs.write("neighbors", engine.neighbors)
+        fs.write("grid_x", engine.grid_x)
+        fs.write("grid_y", engine.grid_y)
+        fs.startWriteStruct("histograms", cv2.FileNode_SEQ)
+        for histogram in engine.histograms:
+            fs.write("", np.ascontiguousarray(histogram).reshape(1, -1))
+        fs.endWriteStruct()
+        fs.write("labels", engine.labels.reshape(-1, 1))
+        fs.startWriteStruct("labelsInfo", cv2.FileNode_SEQ)
+        fs.endWriteStruct()
+        fs.endWriteStruct()
+    finally:
+        fs.release()
+    os.replace(tmp_path, path)
+
+
+def scan_training_files(data_path=DATA_PATH, label_names=None):
+    """Describe every training image on disk.
+
+    Returns ``(files, label_names)``: ``files`` maps image path to its size,
+    mtime and label. People already in ``label_names`` keep their label and
+    new folders get the next free one, so existing histograms stay valid.
+    """
+    label_names = dict(label_names or {})
+    labels_by_person = {person: label for label, person in label_names.items()}
+    next_label = max(label_names, default=-1) + 1
+
+    files = {}
+    current = {}
+    for person in list_person_folders(data_path):
+        label = labels_by_person.get(person)
+        if label is None:
+            label, next_label = next_label, next_label + 1
+        current[label] = person
+        for img_path in list_person_images(os.path.join(data_path, person)):
+            stat = os.stat(img_path)
+            files[img_path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "label": label}
+    return files, current
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Return the manifest of the last training run, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["label_names"] = {int(k): v for k, v in manifest["label_names"].items()}
+        return manifest
+    except (ValueError, KeyError) as e:
+        logging.warning(f"Ignoring unreadable training manifest: {e}")
+        return None
+
+
+def save_manifest(files, label_names, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Histograms from another preprocessing (e.g. whole frames vs face crops) cannot be mixed
+    manifest = {"files": files, "label_names": {str(k): v for k, v in label_names.items()},
+                "preprocess_version": PREPROCESS_VERSION}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+class TrainingCancelled(Exception):
+    """Raised when a training run is cancelled before it writes anything."""
+
+
+def _check_cancelled(cancelled):
+    if cancelled is not None and cancelled():
+        raise TrainingCancelled("Training cancelled.")
+
+
+def compute_histograms(engine, crops, cancelled=None, progress=None):
+    """LBPH histograms for a list of face crops, in cancellable chunks."""
+    chunks = []
+    for start in range(0, len(crops), HISTOGRAM_CHUNK):
+        _check_cancelled(cancelled)
+        chunks.append(engine.compute_histograms(crops[start:start + HISTOGRAM_CHUNK]))
+        if progress:
+            progress(min(start + HISTOGRAM_CHUNK, len(crops)), len(crops))
+    if not chunks:
+        return np.zeros((0, engine.num_bins), np.float32)
+    return np.vstack(chunks)
+
+
+def train_model(data_path=DATA_PATH, incremental=True, workers=None, progress=None, cancelled=None,
+                write_yaml=False):
+    """Train the LBPH model and write it (binary, label names, manifest).
+
+    In incremental mode only images that are new since the last run are
+    processed and appended, the same thing ``LBPHFaceRecognizer.update``
+    does. When an image was changed or deleted, that person's histograms
+    are rebuilt from their current images; other people are left alone.
+    A full run (or a missing manifest/model, or one made with another
+    ``PREPROCESS_VERSION``) retrains everything. The binary model is the
+    only model written; ``write_yaml`` also exports the OpenCV YAML model,
+    which is slow for large models. Without it an old YAML model is removed
+    so tools that read it cannot use a stale one.
+
+    Training uses the same face crops recognition predicts on, produced by
+    ``face_preprocess`` across ``workers`` processes and cached by content.
+    ``progress(stage, done, total)`` reports the "preprocess" and "train"
+    stages; ``cancelled()`` returning True aborts with TrainingCancelled
+    before any output is written. Every output file is replaced atomically.
+
+    Returns a dict summarising what was done, with per-stage timings.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    def stage(name):
+        return (lambda done, total: progress(name, done, total)) if progress else None
+
+    def lap(name):
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = now - started
+        started = now
+
+    # Load: what is on disk, and what the previous run already trained on
+    manifest = load_manifest() if incremental else None
+    if manifest is not None and not binary_model_exists(BINARY_MODEL_DIR):
+        manifest = None
+    if manifest is not None and manifest.get("preprocess_version") != PREPROCESS_VERSION:
+        logging.info("Face preprocessing changed since the last run, retraining everything")
+        manifest = None
+
+    known_names = manifest["label_names"] if manifest else {}
+    files, label_names = scan_training_files(data_path, known_names)
+    if not files:
+        raise ValueError("No valid images found for training!")
+
+    if manifest is None:
+        engine = LBPHEngine()
+        keep = np.zeros(0, bool)
+        rebuild = set()
+        to_process = sorted(files)
+    else:
+        engine, _ = load_binary_model(BINARY_MODEL_DIR, mmap=False)
+        old_files = manifest["files"]
+        added = [p for p in sorted(files) if p not in old_files]
+        changed = [p for p in files if p in old_files and
+                   (old_files[p]["size"], old_files[p]["mtime"]) != (files[p]["size"], files[p]["mtime"])]
+        deleted = [p for p in old_files if p not in files]
+
+        # Changed or deleted images leave stale histograms behind, and rows are
+        # not tied to files, so those people are rebuilt from scratch
+        rebuild = {old_files[p]["label"] for p in changed + deleted}
+        rebuild |= set(known_names) - set(label_names)
+        keep = ~np.isin(engine.labels, list(rebuild))
+        to_process = [p for p in added if files[p]["label"] not in rebuild]
+        to_process += sorted(p for p in files if files[p]["label"] in rebuild)
+    lap("load")
+
+    # Preprocess: face crops for the images that need (re)training
+    crops, stats = preprocess_images(to_process, workers=workers, progress=stage("preprocess"),
+                                     cancelled=cancelled)
+    _check_cancelled(cancelled)
+    faces = [p for p in to_process if crops.get(p) is not None]
+    lap("preprocess")
+
+    # Train: histograms for the new crops, merged with the ones kept
+    histograms = compute_histograms(engine, [crops[p] for p in faces], cancelled, stage("train"))
+    labels = np.array([files[p]["label"] for p in faces], dtype=np.int32)
+    engine.set_model(np.vstack([engine.histograms[keep], histograms]),
+                     np.concatenate([engine.labels[keep], labels]))
+    if engine.empty:
+        raise ValueError("No valid images found for training!")
+    _check_cancelled(cancelled)
+    lap("train")
+
+    # Write: the manifest goes last so an interrupted run is simply redone
+    if write_yaml:
+        write_lbph_model(engine)
+    elif os.path.exists(TRAINED_MODEL_PATH):
+        os.remove(TRAINED_MODEL_PATH)
+    save_binary_model(engine, label_names)
+    save_label_names(label_names)
+    save_manifest(files, label_names)
+    lap("write")
+
+    return {
+        "mode": "full" if manifest is None else "incremental",
+        "processed": len(labels),
+        "rebuilt": sorted(label_names.get(l, known_names.get(l)) for l in rebuild),
+        "histograms": len(engine.labels),
+        "people": len(label_names),
+        "preprocess": stats,
+        "timings": timings,
+    }
+
+
+def format_summary(summary):
+    """Human-readable lines describing a train_model result."""
+    stats, timings = summary["preprocess"], summary["timings"]
+    lines = [
+        f"{summary['mode'].capitalize()} training: {summary['processed']} faces processed, "
+        f"{summary['histograms']} histograms for {summary['people']} people",
+        f"Preprocessed {stats['images']} images at {stats['images_per_sec']:.1f} images/s "
+        f"({stats['cached']} cached, {stats['no_face']} without a face)",
+        "Timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()),
+    ]
+    if summary["rebuilt"]:
+        lines.insert(1, f"Rebuilt: {', '.join(summary['rebuilt'])}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the face recognition model.")
+    parser.add_argument("--data", default=DATA_PATH, help="training images folder")
+    parser.add_argument("--full", action="store_true", help="retrain everything instead of only new images")
+    parser.add_argument("--workers", type=int, default=None, help="preprocessing processes (default: all cores)")
+    parser.add_argument("--yaml", action="store_true",
+                        help=f"also export the OpenCV YAML model to {TRAINED_MODEL_PATH} (slow for large models)")
+    args = parser.parse_args()
+
+    def report(stage, done, total):
+        print(f"\r{stage}: {done}/{total}", end="" if done < total else "\n", flush=True)
+
+    try:
+        summary = train_model(args.data, incremental=not args.full, workers=args.workers, progress=report,
+                              write_yaml=args.yaml)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Training failed: {e}")
+        return 1
+    for line in format_summary(summary):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
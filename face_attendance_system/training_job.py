@@ -0,0 +1,41 @@
+import threading
+import logging
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from training import DATA_PATH, TrainingCancelled, train_model
+
+
+class TrainingJob(QThread):
+    """Runs training.train_model off the GUI thread.
+
+    Live feeds keep rendering while the job runs; progress and the result
+    arrive through Qt signals on the GUI thread.
+    """
+    progress = pyqtSignal(str, int, int)  # stage, done, total
+    completed = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, data_path=DATA_PATH, incremental=True, workers=None, parent=None):
+        super().__init__(parent)
+        self.data_path = data_path
+        self.incremental = incremental
+        self.workers = workers
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop; nothing is written if it has not reached the write stage."""
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            summary = train_model(self.data_path, incremental=self.incremental, workers=self.workers,
+                                  progress=self.progress.emit, cancelled=self._cancel_event.is_set)
+            self.completed.emit(summary)
+        except TrainingCancelled:
+            self.cancelled.emit()
+        except (FileNotFoundError, ValueError) as e:
+            self.failed.emit(str(e))
+        except Exception as e:
+            logging.error(f"Training error: {str(e)}")
+            self.failed.emit(f"Training failed: {str(e)}")
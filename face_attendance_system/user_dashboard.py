@@ -1,8 +1,6 @@
 import sys
 import cv2
 import os
-import numpy as np
-import csv
 import logging
 import socket
 import threading
@@ -12,18 +10,31 @@ from PyQt5.QtWidgets import (
     QLabel, QListWidget, QGridLayout, QTextEdit, QComboBox, QMessageBox,
     QDialog, QTableWidgetItem, QTableWidget, QHeaderView, QLineEdit, QInputDialog
 )
-from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
 import pandas as pd
-import datetime
 import time
 from concurrent.futures import ThreadPoolExecutor
+from training import format_summary
+from training_job import TrainingJob
+from model_registry import get_registry
+from dual_stream import DualStream
+from frame_context import FrameContext
+from tile_renderer import RenderedTile, get_render_executor, shutdown_render_executor
+from video_wall import create_video_wall, WALL_MIN_GRID
+from capture_hub import get_hub
+from frame_grabber import parse_seconds, OPEN_TIMEOUT, READ_TIMEOUT
+from ffmpeg_capture import FFmpegSettings, parse_capture_size
+from motion_gate import parse_threshold
+from frame_analyzer import FrameAnalyzer, NO_LABEL, is_enabled
+from analysis_pool import AnalysisPool
+from analysis_scheduler import AnalysisScheduler
+from roi_mask import parse_roi, format_roi, ROI_HELP
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 # Constants
-MODEL_PATH = "models/trained_model.yml"
 DATA_PATH = "data/training_images"
 LOGS_FILE = "data/logs.csv"
 CAMERA_CSV = "data/camera.csv"
@@ -32,15 +43,7 @@ MAX_THREADS = 50  # Limit concurrent scanning threads
 LOCAL_NETWORKS = ["192.168.1.0/24", "192.168.0.0/24", "10.0.0.0/24"]  # Common local networks
 DEFAULT_WINDOW_SIZE = (1280, 720)  # Standard HD resolution
 MIN_CAMERA_SIZE = (320, 240)  # Minimum camera display size
-
-# Face detection model
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-
-if os.path.exists(MODEL_PATH):
-    recognizer.read(MODEL_PATH)
-else:
-    recognizer = None
+RECOGNITION_THRESHOLD = 80  # LBPH distance under which a face is labelled
 
 class CameraDiscoveryWorker(QObject):
     camera_found = pyqtSignal(dict)
@@ -115,16 +118,49 @@ class CameraDiscoveryWorker(QObject):
         self.stop_flag = True
 
 class CameraStream(QLabel):
-    def __init__(self, camera_info):
+    # Emitted from a render thread; Qt queues it to the GUI thread
+    tile_rendered = pyqtSignal(object)
+    
+    def __init__(self, camera_info, scheduler, analysis_pool=None, maximized=False, wall=None, wall_index=0):
         super().__init__()
+        # On a video wall this widget is never shown; frames and status go to its wall tile
+        self.wall = wall
+        self.wall_index = wall_index
         self.camera_info = camera_info
         self.ip = camera_info.get('ip', '')
         self.rtsp_url = self.generate_rtsp_url()
+        self.substream_url = self.generate_substream_url()
+        self.maximized = maximized  # A 1x1 tile shows the main stream
         self.is_connected = False
-        self.frame_counter = 0
+        self.records = None
+        self.render_pending = False  # One frame at a time in the render threads
+        self.stopped = False
+        self.tile_rendered.connect(self.show_tile)
+        # Face analysis runs in a worker process when a pool is available
+        self.analysis_pool = analysis_pool
+        self.camera_id = analysis_pool.add_camera(camera_info) if analysis_pool is not None else None
+        self.analyzer = None
+        self.analysis_note = None  # Drawn on the tile of a camera that is not analysed
+        if self.camera_id is None and analysis_pool is not None:
+            # Past the pool's MAX_CAMERAS limit: shown, but not analysed anywhere
+            self.analysis_note = f"Face analysis off (camera limit {analysis_pool.max_cameras})"
+        elif self.camera_id is None:
+            # No worker processes: analyse in this process, on the camera's own thread so tiles are not held up
+            logging.warning(f"Analysis workers unavailable, analysing {camera_info.get('name', self.ip)} "
+                            f"in the GUI process")
+            self.analyzer = FrameAnalyzer(camera_info, get_registry())
+            self.analysis_lock = threading.Lock()
+            self.analysis_pending = False
+            self.analysis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analyse")
+        self.analysing = self.analysis_note is None
+        # The scheduler decides which frames get analysed, across all open cameras
+        self.scheduler = scheduler
+        self.schedule_key = self.camera_id if self.camera_id is not None else id(self)
+        if self.analysing:
+            scheduler.add_camera(self.schedule_key, camera_info.get('name', self.ip))
         self.setAlignment(Qt.AlignCenter)
         self.setMinimumSize(*MIN_CAMERA_SIZE)
-        self.setText("Initializing stream...")
+        self.set_status("Connecting...")
         
         self.connect_camera()
         
@@ -146,92 +182,210 @@ class CameraStream(QLabel):
             return f"rtsp://{user}:{password}@{ip}:{port}/cam/realmonitor?channel=1&subtype=0"
         return f"rtsp://{user}:{password}@{ip}:{port}/stream1"
     
+    def generate_substream_url(self):
+        """Low-resolution substream URL, or None if the camera has none configured"""
+        # Not guessed from the brand: a wrong guess would show a dead tile instead of the main stream.
+        # The add camera screen fills this in for brands it knows.
+        url = self.camera_info.get('substream_url')
+        if isinstance(url, str) and url.strip():
+            return url.strip()
+        return None
+    
     def connect_camera(self):
-        """Establish camera connection with optimized settings"""
-        try:
-            self.cap = cv2.VideoCapture(self.rtsp_url)
-            if not self.cap.isOpened():
-                raise ConnectionError("Failed to open stream")
-            
-            # Optimize video capture settings
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-            
-            self.is_connected = True
-            self.setText("Connected")
-        except Exception as e:
-            self.is_connected = False
-            self.setText(f"Connection Error\n{str(e)}")
-            logging.error(f"Connection error: {str(e)}")
+        """Start the substream for the tile; the main stream opens when there is something to recognize"""
+        on_frame = None
+        if self.camera_id is not None:
+            # Frames go to the analysis workers straight from the grab thread
+            on_frame = self.submit_frame
+        capture, main_capture = self.capture_settings()
+        main_url, sub_url = self.rtsp_url, self.substream_url
+        if not self.analysing and sub_url and not self.maximized:
+            main_url, sub_url = sub_url, None  # Nothing to recognize, so the main stream is never needed
+        self.stream = DualStream(main_url, sub_url, self.camera_info.get('name', self.ip),
+                                 on_main_frame=on_frame, main_always=self.maximized,
+                                 motion_threshold=parse_threshold(self.camera_info.get('motion_threshold')),
+                                 open_timeout=parse_seconds(self.camera_info.get('open_timeout'), OPEN_TIMEOUT),
+                                 read_timeout=parse_seconds(self.camera_info.get('read_timeout'), READ_TIMEOUT),
+                                 capture=capture, main_capture=main_capture).start()
+        self.grabber = self.stream.display
+        self.last_sequence = 0
+    
+    def capture_settings(self):
+        """Decoders for the shown streams and for an analysis-only main stream (None = OpenCV)"""
+        if str(self.camera_info.get('capture', '')).strip().lower() != 'ffmpeg':
+            return None, None
+        # ffmpeg scales the shown streams and hands the analysis stream over in gray
+        display = FFmpegSettings("bgr24", parse_capture_size(self.camera_info.get('capture_size')), False)
+        analysis = FFmpegSettings("gray", None, is_enabled(self.camera_info.get('keyframes_only', '')))
+        return display, analysis
+    
+    def submit_frame(self, sequence, frame):
+        """Called on the grab thread: hand the frame to the workers if it is within budget"""
+        camera_id = self.camera_id
+        if camera_id is not None and self.scheduler.should_analyse(self.schedule_key):
+            self.analysis_pool.submit(camera_id, sequence, frame)
     
     def update_frame(self):
-        if not self.is_connected:
+        # Hidden tiles get a smaller share of the analysis budget
+        if self.analysing:
+            self.scheduler.set_visible(self.schedule_key, self.on_screen())
+        if self.stream.poll():
+            self.main_closed()
+        # Never blocks: the grab thread has already decoded the newest frame
+        sequence, frame = self.grabber.latest()
+        if sequence == self.last_sequence:
+            if not self.grabber.connected:
+                if self.is_connected:
+                    self.reconnect()
+                elif self.grabber.error:
+                    self.set_status(f"Connection Error\n{self.grabber.error}")
             return
-            
+        if self.render_pending:
+            return  # Still rendering the previous frame; pick up the newest one next tick
+        self.last_sequence = sequence
+        self.is_connected = True
+        
+        if not self.stream.main_open:
+            self.records = None
+        elif self.camera_id is not None:
+            _, self.records = self.analysis_pool.latest(self.camera_id)
+        elif (self.analyzer is not None and not self.analysis_pending
+              and self.scheduler.should_analyse(self.schedule_key)):
+            main_frame = self.stream.main.latest()[1]
+            if main_frame is not None:
+                self.analysis_pending = True
+                self.analysis_executor.submit(self.analyse_locally, main_frame)
+        # Resizing and drawing happen off the GUI thread
+        self.render_pending = True
+        size = self.wall.tile_rect(self.wall_index).size() if self.wall is not None else self.size()
+        get_render_executor().submit(self.render_tile, frame, self.stream.main_shape(),
+                                     size.width(), size.height())
+    
+    def analyse_locally(self, frame):
+        """Analysis thread: the in-process fallback when there are no worker processes"""
         try:
-            ret, frame = self.cap.read()
-            if not ret:
-                self.reconnect()
-                return
-                
-            self.frame_counter += 1
-            if self.frame_counter % 2 == 0:  # Process every other frame
-                frame = self.process_frame(frame)
-            self.display_frame(frame)
+            with self.analysis_lock:
+                start = time.perf_counter()
+                self.records = self.analyzer.analyze(FrameContext(frame))
+                self.scheduler.report(self.schedule_key, self.analyzer.active, time.perf_counter() - start)
         except Exception as e:
-            logging.error(f"Frame update error: {str(e)}")
-            self.reconnect()
+            logging.error(f"Face analysis error: {str(e)}")
+        finally:
+            self.analysis_pending = False
     
-    def process_frame(self, frame):
-        """Perform face detection on frame"""
+    def render_tile(self, frame, main_shape, width, height):
+        """Render thread: produce the tile-sized image"""
+        rendered = None
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(50, 50))
-            
-            for (x, y, w, h) in faces:
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-                if recognizer:
-                    label, confidence = recognizer.predict(gray[y:y+h, x:x+w])
-                    if confidence < 80:
-                        cv2.putText(frame, f"ID:{label}", (x, y-10),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-            return frame
-        except:
-            return frame
+            # The grabber's frame is shared; the tile-sized image is derived from it
+            context = FrameContext(frame)
+            display = context.display_bgr(width, height)
+            overlays = self.record_overlays(display, self.records, main_shape)
+            if self.wall is None:
+                self.draw_overlays(display, overlays)
+            if self.analysis_note:
+                cv2.putText(display, self.analysis_note, (5, display.shape[0] - 8),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+            rendered = RenderedTile(display)
+            rendered.overlays = overlays  # The wall draws them as geometry
+        except Exception as e:
+            logging.error(f"Frame update error: {str(e)}")
+        try:
+            self.tile_rendered.emit(rendered)
+        except RuntimeError:
+            pass  # The tile was deleted while rendering
+    
+    def show_tile(self, rendered):
+        """GUI thread: swap in the rendered image"""
+        self.render_pending = False
+        if self.stopped or rendered is None or not self.is_connected:
+            return
+        if self.records is not None and len(self.records):
+            self.stream.keep_main_open()  # Faces in view: keep recognizing
+            summary = (self.analysis_pool.quality_summary(self.camera_id) if self.camera_id is not None
+                       else self.analyzer.quality.summary())
+            if summary:
+                self.setToolTip(summary)
+        if self.wall is not None:
+            self.wall.set_tile(self.wall_index, rendered, rendered.overlays)
+        else:
+            self.setPixmap(QPixmap.fromImage(rendered.image))
+    
+    def record_overlays(self, frame, records, main_shape):
+        """Analysed faces as (x, y, w, h, label) boxes in the tile-sized frame's pixels"""
+        if records is None or not len(records):
+            return []
+        # Boxes are in main stream pixels; the tile shows a resized stream
+        scale = frame.shape[1] / main_shape[1] if main_shape is not None else 1.0
+        overlays = []
+        for track, x, y, w, h, label, confidence in records.tolist():
+            x, y, w, h = (int(v * scale) for v in (x, y, w, h))
+            text = f"#{track} ID:{label}" if label != NO_LABEL and confidence < RECOGNITION_THRESHOLD else None
+            overlays.append((x, y, w, h, text))
+        return overlays
+    
+    def draw_overlays(self, frame, overlays):
+        for x, y, w, h, text in overlays:
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+            if text:
+                cv2.putText(frame, text, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    
+    def set_status(self, text):
+        if self.wall is not None:
+            self.wall.set_text(self.wall_index, text)
+        else:
+            self.setText(text)
+    
+    def on_screen(self):
+        widget = self.wall if self.wall is not None else self
+        return not widget.visibleRegion().isEmpty()
+    
+    def main_closed(self):
+        """The main stream went idle and was closed; drop its tracks"""
+        self.records = None
+        self.reset_analysis()
+    
+    def reset_analysis(self):
+        if self.camera_id is not None:
+            self.analysis_pool.reset_camera(self.camera_id)
+        elif self.analyzer is not None:
+            with self.analysis_lock:
+                self.analyzer.reset()
     
     def reconnect(self):
-        """Attempt to reconnect to camera"""
+        """Show that the stream dropped; the grab thread reopens it by itself"""
         self.is_connected = False
-        self.setText("Reconnecting...")
-        threading.Thread(target=self.connect_camera, daemon=True).start()
+        self.set_status(f"Reconnecting...\n{self.grabber.error or ''}")
+        self.records = None
+        self.reset_analysis()
     
-    def display_frame(self, frame):
-        """Display frame in the QLabel"""
-        try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_frame.shape
-            bytes_per_line = ch * w
-            qimg = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            self.setPixmap(QPixmap.fromImage(qimg).scaled(
-                self.width(), self.height(), Qt.KeepAspectRatio))
-        except:
-            pass
+    def stop(self):
+        """Stop refreshing and release the stream"""
+        self.stopped = True
+        self.timer.stop()
+        self.stream.stop()
+        if self.analysing:
+            self.scheduler.remove_camera(self.schedule_key)
+        if self.analyzer is not None:
+            self.analysis_executor.shutdown(wait=False, cancel_futures=True)
+        if self.camera_id is not None:
+            self.analysis_pool.remove_camera(self.camera_id)
+            self.camera_id = None
     
     def closeEvent(self, event):
         """Clean up resources"""
         try:
-            if hasattr(self, 'cap'):
-                self.cap.release()
-            self.timer.stop()
+            self.stop()
         except:
             pass
         event.accept()
 
 class AddCameraDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, camera=None):
         super().__init__(parent)
-        self.setWindowTitle("Add Camera")
+        # camera: existing camera.csv row (column -> text) to edit instead of adding
+        self.camera = camera or {}
+        self.setWindowTitle("Edit Camera" if camera else "Add Camera")
         self.setFixedSize(400, 300)
         
         layout = QVBoxLayout()
@@ -243,11 +397,27 @@ class AddCameraDialog(QDialog):
             "Username": QLineEdit("admin"),
             "Password": QLineEdit(),
             "Brand": QComboBox(),
-            "Channel": QLineEdit("1")
+            "Channel": QLineEdit("1"),
+            "ROI": QLineEdit(),
+            "Substream URL": QLineEdit()
         }
+        self.fields["Substream URL"].setPlaceholderText("optional, low-resolution stream for the grid")
+        self.fields["ROI"].setPlaceholderText("0.2 0.1, 0.8 0.1, 0.8 0.9, 0.2 0.9")
+        self.fields["ROI"].setToolTip(ROI_HELP)
         
         self.fields["Brand"].addItems(["Generic", "Hikvision", "Dahua", "Axis"])
         
+        for label, widget in self.fields.items():
+            value = self.camera.get(label, "")
+            if not value:
+                continue
+            if isinstance(widget, QComboBox):
+                if widget.findText(value) < 0:
+                    widget.addItem(value)
+                widget.setCurrentText(value)
+            else:
+                widget.setText(value)
+        
         for label, widget in self.fields.items():
             row = QHBoxLayout()
             row.addWidget(QLabel(f"{label}:"))
@@ -265,8 +435,16 @@ class AddCameraDialog(QDialog):
         layout.addLayout(button_box)
         self.setLayout(layout)
     
+    def accept(self):
+        try:
+            parse_roi(self.fields["ROI"].text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid ROI", f"{e}\n\n{ROI_HELP}")
+            return
+        super().accept()
+    
     def get_camera_details(self):
-        return {
+        details = {
             'Camera Name': self.fields["Camera Name"].text(),
             'IP Address': self.fields["IP Address"].text(),
             'Port': self.fields["Port"].text(),
@@ -274,8 +452,15 @@ class AddCameraDialog(QDialog):
             'Password': self.fields["Password"].text(),
             'Brand': self.fields["Brand"].currentText(),
             'Channel': self.fields["Channel"].text(),
-            'RTSP URL': ""
+            'RTSP URL': "",
+            'ROI': format_roi(parse_roi(self.fields["ROI"].text())),
+            'Substream URL': self.fields["Substream URL"].text()
         }
+        # A stored RTSP URL stays valid while the connection details are unchanged
+        connection = ('IP Address', 'Port', 'Username', 'Password', 'Channel')
+        if all(details[key] == self.camera.get(key, "") for key in connection):
+            details['RTSP URL'] = self.camera.get('RTSP URL', "")
+        return details
 
 class AddPersonForm(QDialog):
     def __init__(self, parent=None):
@@ -316,7 +501,16 @@ class UserDashboard(QMainWindow):
         self.setWindowTitle("NVR/DVR Surveillance System")
         self.resize(*DEFAULT_WINDOW_SIZE)
         self.cameras = []
+        self.training_job = None
+        self.analysis_pool = None
+        self.wall_streams = []  # Cameras drawn on the video wall of a large grid
+        self.analysis_scheduler = AnalysisScheduler()
         self.setup_ui()
+        
+        # Per-camera analysis rates in the status area
+        self.analysis_timer = QTimer(self)
+        self.analysis_timer.timeout.connect(self.update_analysis_status)
+        self.analysis_timer.start(1000)
     
     def setup_ui(self):
         """Initialize the user interface"""
@@ -369,9 +563,14 @@ class UserDashboard(QMainWindow):
         self.btn_add_camera.clicked.connect(self.open_add_camera_dialog)
         sidebar.addWidget(self.btn_add_camera)
         
+        self.btn_edit_camera = QPushButton("Edit Selected Camera")
+        self.btn_edit_camera.clicked.connect(self.open_edit_camera_dialog)
+        sidebar.addWidget(self.btn_edit_camera)
+        self.camera_list.itemDoubleClicked.connect(self.open_edit_camera_dialog)
+        
         sidebar.addWidget(QLabel("Display Layout:"))
         self.grid_combo = QComboBox()
-        self.grid_combo.addItems(["1x1", "2x2", "3x3"])
+        self.grid_combo.addItems(["1x1", "2x2", "3x3", "4x4"])
         self.grid_combo.currentTextChanged.connect(self.change_grid_view)
         sidebar.addWidget(self.grid_combo)
         
@@ -400,6 +599,10 @@ class UserDashboard(QMainWindow):
         self.status_label = QLabel("Ready")
         log_panel.addWidget(self.status_label)
         
+        self.analysis_label = QLabel("")
+        self.analysis_label.setWordWrap(True)
+        log_panel.addWidget(self.analysis_label)
+        
         content_layout.addLayout(log_panel)
         main_layout.addLayout(content_layout, stretch=1)
         
@@ -525,6 +728,19 @@ class UserDashboard(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save camera: {str(e)}")
     
+    def update_camera(self, index, camera_data):
+        """Overwrite row ``index`` of the camera CSV, keeping columns the dialog does not show"""
+        try:
+            df = pd.read_csv(CAMERA_CSV, dtype=str, keep_default_na=False)
+            for column, value in camera_data.items():
+                if column not in df.columns:
+                    df[column] = ""
+                df.at[index, column] = str(value)
+            df.to_csv(CAMERA_CSV, index=False)
+            self.load_cameras()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to update camera: {str(e)}")
+    
     def load_cameras(self):
         """Load cameras from CSV file"""
         try:
@@ -545,7 +761,19 @@ class UserDashboard(QMainWindow):
                     'password': row.get("Password", ""),
                     'brand': row.get("Brand", "Generic"),
                     'channel': row.get("Channel", 1),
-                    'rtsp_url': row.get("RTSP URL", "")
+                    'rtsp_url': row.get("RTSP URL", ""),
+                    'motion_threshold': row.get("Motion Threshold"),
+                    'min_face_size': row.get("Min Face Size"),
+                    'detect_width': row.get("Detect Width"),
+                    'roi': row.get("ROI"),
+                    'detector': row.get("Detector"),
+                    'eye_check': row.get("Eye Check", ""),
+                    'substream_url': row.get("Substream URL", ""),
+                    'open_timeout': row.get("Open Timeout", ""),
+                    'read_timeout': row.get("Read Timeout", ""),
+                    'capture': row.get("Capture", ""),
+                    'capture_size': row.get("Capture Size", ""),
+                    'keyframes_only': row.get("Keyframes Only", "")
                 }
                 self.cameras.append(camera_info)
                 self.camera_list.addItem(f"{camera_info['name']} ({camera_info['ip']})")
@@ -562,7 +790,21 @@ class UserDashboard(QMainWindow):
             camera_info = dialog.get_camera_details()
             self.save_camera(camera_info)
             self.activity_log.append(f"✅ Added camera: {camera_info['Camera Name']}")
-    
+
+    def open_edit_camera_dialog(self, *args):
+        """Open the camera dialog pre-filled with the selected camera's settings"""
+        index = self.camera_list.currentRow()
+        if index < 0:
+            QMessageBox.information(self, "Edit Camera", "Select a camera in the list first.")
+            return
+        # Rows of the list and of the CSV are in the same order (see load_cameras)
+        df = pd.read_csv(CAMERA_CSV, dtype=str, keep_default_na=False)
+        dialog = AddCameraDialog(self, df.iloc[index].to_dict())
+        if dialog.exec_() == QDialog.Accepted:
+            camera_info = dialog.get_camera_details()
+            self.update_camera(index, camera_info)
+            self.activity_log.append(f"✅ Updated camera: {camera_info['Camera Name']}")
+
     def change_grid_view(self, text):
         """Change the grid layout of camera views"""
         size = int(text[0])  # Extract number from "1x1", "2x2", etc.
@@ -571,11 +813,21 @@ class UserDashboard(QMainWindow):
     def update_grid_view(self, size):
         """Update the video grid layout"""
         try:
-            # Clear existing widgets
+            # Clear existing widgets; their streams stay open in the capture hub for the new tiles
             while self.video_grid.count():
                 item = self.video_grid.takeAt(0)
                 if item.widget():
+                    if isinstance(item.widget(), CameraStream):
+                        item.widget().stop()
                     item.widget().deleteLater()
+            for stream in self.wall_streams:
+                stream.stop()
+                stream.deleteLater()
+            self.wall_streams = []
+            
+            if size >= WALL_MIN_GRID:
+                self.show_video_wall(size)
+                return
             
             # Add camera feeds to grid
             for i in range(size):
@@ -583,7 +835,8 @@ class UserDashboard(QMainWindow):
                     idx = i * size + j
                     if idx < len(self.cameras):
                         try:
-                            cam_feed = CameraStream(self.cameras[idx])
+                            cam_feed = CameraStream(self.cameras[idx], self.analysis_scheduler,
+                                                    self.get_analysis_pool(), maximized=size == 1)
                             self.video_grid.addWidget(cam_feed, i, j)
                         except Exception as e:
                             logging.error(f"Error creating stream: {str(e)}")
@@ -600,44 +853,84 @@ class UserDashboard(QMainWindow):
             logging.error(f"Error updating grid: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to update grid: {str(e)}")
     
+    def show_video_wall(self, size):
+        """Large grids: one widget composites every camera instead of a QLabel each"""
+        wall = create_video_wall()
+        wall.set_grid(size, size)
+        self.video_grid.addWidget(wall, 0, 0)
+        for idx in range(size * size):
+            if idx >= len(self.cameras):
+                wall.set_text(idx, "No Feed")
+                continue
+            try:
+                self.wall_streams.append(CameraStream(self.cameras[idx], self.analysis_scheduler,
+                                                      self.get_analysis_pool(), wall=wall, wall_index=idx))
+            except Exception as e:
+                logging.error(f"Error creating stream: {str(e)}")
+                wall.set_text(idx, f"Error: {str(e)}")
+    
+    def update_analysis_status(self):
+        """Show measured/allowed analysis fps per camera"""
+        self.analysis_label.setText(self.analysis_scheduler.status_text())
+    
+    def get_analysis_pool(self):
+        """Start the face analysis worker processes on first use"""
+        if self.analysis_pool is None:
+            try:
+                self.analysis_pool = AnalysisPool(scheduler=self.analysis_scheduler)
+                self.analysis_scheduler.cores = self.analysis_pool.workers
+                logging.info(f"Face analysis running in {self.analysis_pool.workers} worker processes")
+            except Exception as e:
+                # Streams fall back to analysing frames in this process
+                logging.error(f"Could not start analysis workers: {e}")
+                self.analysis_pool = False
+        return self.analysis_pool or None
+    
     def train_model(self):
-        """Train the face recognition model"""
-        try:
-            images, labels = [], []
-            label_map = {}
-
-            if not os.path.exists(DATA_PATH):
-                QMessageBox.critical(self, "Error", "Training images folder not found!")
-                return
-
-            person_folders = [d for d in os.listdir(DATA_PATH) if os.path.isdir(os.path.join(DATA_PATH, d))]
-            if not person_folders:
-                QMessageBox.critical(self, "Error", "No person folders found!")
-                return
-
-            for label, person in enumerate(person_folders):
-                person_path = os.path.join(DATA_PATH, person)
-                label_map[label] = person
-
-                for img_name in [f for f in os.listdir(person_path) if f.endswith(('.jpg', '.png', '.jpeg'))]:
-                    img_path = os.path.join(person_path, img_name)
-                    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-                    if img is not None:
-                        images.append(img)
-                        labels.append(label)
+        """Train the face recognition model in the background, or cancel the running job"""
+        if self.training_job is not None and self.training_job.isRunning():
+            self.training_job.cancel()
+            self.btn_train.setEnabled(False)
+            self.status_label.setText("Cancelling training...")
+            return
 
-            if images:
-                recognizer = cv2.face.LBPHFaceRecognizer_create()
-                recognizer.train(images, np.array(labels))
-                os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-                recognizer.write(MODEL_PATH)
-                self.activity_log.append("✅ Model trained successfully!")
-                QMessageBox.information(self, "Success", "Model trained successfully!")
-            else:
-                QMessageBox.critical(self, "Error", "No valid images found for training!")
-        except Exception as e:
-            logging.error(f"Training error: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Training failed: {str(e)}")
+        self.training_job = TrainingJob(DATA_PATH, parent=self)
+        self.training_job.progress.connect(self.update_training_progress)
+        self.training_job.completed.connect(self.training_finished)
+        self.training_job.failed.connect(self.training_failed)
+        self.training_job.cancelled.connect(self.training_cancelled)
+        self.btn_train.setText("Cancel Training")
+        self.activity_log.append("🚀 Training started...")
+        self.training_job.start()
+    
+    def update_training_progress(self, stage, done, total):
+        """Show training progress in the status bar"""
+        percent = int((done / total) * 100) if total else 100
+        self.status_label.setText(f"Training ({stage})... {percent}% ({done}/{total})")
+    
+    def training_finished(self, summary):
+        """Swap in the new model and report the training run"""
+        registry = get_registry()
+        registry.reload()
+        for line in format_summary(summary):
+            self.activity_log.append(line)
+        self.activity_log.append(f"✅ Model trained successfully! (version {registry.current().version})")
+        self.reset_training_controls("Training completed")
+        QMessageBox.information(self, "Success", "Model trained successfully!")
+    
+    def training_failed(self, message):
+        self.activity_log.append(f"❌ {message}")
+        self.reset_training_controls("Training failed")
+        QMessageBox.critical(self, "Error", message)
+    
+    def training_cancelled(self):
+        self.activity_log.append("⚠️ Training cancelled, previous model kept")
+        self.reset_training_controls("Training cancelled")
+    
+    def reset_training_controls(self, status):
+        self.btn_train.setText("Train Model")
+        self.btn_train.setEnabled(True)
+        self.status_label.setText(status)
     
     def open_add_person_form(self):
         """Open dialog to add new person to database"""
@@ -714,11 +1007,21 @@ class UserDashboard(QMainWindow):
     def closeEvent(self, event):
         """Clean up resources when closing"""
         try:
+            if self.training_job is not None and self.training_job.isRunning():
+                self.training_job.cancel()
+                self.training_job.wait()
+
             # Stop all camera streams
             for i in range(self.video_grid.count()):
                 widget = self.video_grid.itemAt(i).widget()
                 if isinstance(widget, CameraStream):
                     widget.close()
+            for stream in self.wall_streams:
+                stream.stop()
+            get_hub().close()
+            shutdown_render_executor()
+            if self.analysis_pool:
+                self.analysis_pool.close()
         except Exception as e:
             logging.error(f"Error during close: {str(e)}")
         event.accept()
@@ -5,4 +5,9 @@ MAX_CAMERAS = 5
 # File paths
 USERS_CSV = "data/users.csv"
 ATTENDANCE_CSV = "data/attendance.csv"
-CAMERA_INDICES_JSON = "data/camera_indices.json"
\ No newline at end of file
+CAMERA_INDICES_JSON = "data/camera_indices.json"
+
+# Model paths
+TRAINED_MODEL_PATH = "models/trained_model.yml"
+LABEL_NAMES_PATH = "models/label_names.pkl"
+BINARY_MODEL_DIR = "models/lbph_model"
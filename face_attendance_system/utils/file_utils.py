@@ -81,3 +81,23 @@ def save_limits(max_users, max_cameras):
     limits = {"MAX_USERS": max_users, "MAX_CAMERAS": max_cameras}
     with open(LIMITS_FILE, "w") as f:
         json.dump(limits, f)
+
+
+ADDONS_FILE = "data/addons_state.csv"
+
+def load_addons_state():
+    """Returns the add-on toggles saved by the admin dashboard as {name: enabled}."""
+    addons = {}
+    if not os.path.exists(ADDONS_FILE):
+        return addons
+    try:
+        with open(ADDONS_FILE, mode="r", newline="") as file:
+            for row in csv.reader(file):
+                if len(row) >= 2:
+                    addons[row[0]] = row[1] == "True"
+    except csv.Error as e:
+        print(f"CSV reading error: {e}")
+    return addons
+
+def addon_enabled(name, default=False):
+    return load_addons_state().get(name, default)
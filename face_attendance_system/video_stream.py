@@ -1,7 +1,9 @@
+import time
 import cv2
 from PyQt5.QtCore import QThread, pyqtSignal,Qt
 from PyQt5.QtGui import QImage, QPixmap
 from face_recognition import FaceRecognition
+from capture_hub import get_hub
 
 class VideoStream(QThread):
     update_frame_signal = pyqtSignal(QPixmap)
@@ -13,12 +15,14 @@ class VideoStream(QThread):
         self.face_recognition = FaceRecognition()
 
     def run(self):
-        cap = cv2.VideoCapture(self.camera_index)
+        stream = get_hub().subscribe(self.camera_index)
+        last_sequence = 0
         while self.running:
-            ret, frame = cap.read()
-            if ret:
-                # Apply face recognition
-                frame = self.face_recognition.update_frame_with_recognition(frame)
+            sequence, frame = stream.latest()
+            if sequence != last_sequence:
+                last_sequence = sequence
+                # Apply face recognition on our own copy of the shared frame
+                frame = self.face_recognition.update_frame_with_recognition(frame.copy())
 
                 # Convert frame to QPixmap for display
                 height, width, channels = frame.shape
@@ -28,9 +32,11 @@ class VideoStream(QThread):
 
                 # Emit the updated frame
                 self.update_frame_signal.emit(pixmap.scaled(640, 480, Qt.KeepAspectRatio))
-            else:
+            elif stream.error:
                 break
-        cap.release()
+            else:
+                time.sleep(0.01)
+        stream.stop()
 
     def stop(self):
         self.running = False
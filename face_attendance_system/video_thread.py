@@ -3,6 +3,8 @@ from PyQt5.QtGui import QImage, QPixmap
 import cv2
 import time
 from face_recognition import FaceRecognition
+from capture_hub import get_hub
+from frame_context import FrameContext
 
 class VideoCaptureThread(QThread):
     update_frame_signal = pyqtSignal(QPixmap)
@@ -15,20 +17,26 @@ class VideoCaptureThread(QThread):
         self.running = True
 
     def run(self):
+        # Shared with any other screen showing the same camera
+        stream = get_hub().subscribe(self.camera_url)
+        last_sequence = 0
         try:
-            cap = cv2.VideoCapture(self.camera_url)
-            if not cap.isOpened():
-                raise ConnectionError(f"Failed to open camera: {self.camera_url}")
-
             while self.running:
-                ret, frame = cap.read()
-                if not ret:
-                    self.error_signal.emit(f"Lost connection to camera: {self.camera_url}")
-                    break
-
-                frame = self.face_recognition.update_frame(frame)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                qt_image = QImage(rgb_frame.data, rgb_frame.shape[1], rgb_frame.shape[0], QImage.Format_RGB888)
+                sequence, frame = stream.latest()
+                if sequence == last_sequence:
+                    if stream.error:
+                        if last_sequence:
+                            self.error_signal.emit(f"Lost connection to camera: {self.camera_url}")
+                        else:
+                            self.error_signal.emit(f"Failed to open camera: {self.camera_url}")
+                        break
+                    time.sleep(0.01)
+                    continue
+                last_sequence = sequence
+
+                # Gray comes from the shared frame; boxes are drawn on our copy, shown as BGR
+                frame = self.face_recognition.update_frame(frame.copy(), FrameContext(frame))
+                qt_image = QImage(frame.data, frame.shape[1], frame.shape[0], frame.strides[0], QImage.Format_BGR888)
                 self.update_frame_signal.emit(QPixmap.fromImage(qt_image))
 
                 time.sleep(0.03)  # Reduce CPU load
@@ -36,7 +44,7 @@ class VideoCaptureThread(QThread):
         except Exception as e:
             self.error_signal.emit(str(e))
         finally:
-            cap.release()
+            stream.stop()
 
     def stop(self):
         self.running = False
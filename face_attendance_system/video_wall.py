@@ -0,0 +1,152 @@
+import os
+import logging
+from PyQt5.QtWidgets import QWidget, QOpenGLWidget
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QOpenGLContext, QOffscreenSurface
+from PyQt5.QtCore import Qt, QCoreApplication, QRect
+
+WALL_MIN_GRID = 3  # Grids of this size and up are drawn by a video wall, not one QLabel per camera
+TILE_GAP = 2  # Pixels between tiles
+BACKGROUND_COLOR = QColor(0, 0, 0)
+TEXT_COLOR = QColor(255, 255, 255)
+BOX_COLOR = QColor(0, 255, 0)
+SOFTWARE_GL_ENV = "FACE_ATTENDANCE_SOFTWARE_GL"  # Set to 1 to force Mesa's software renderer
+
+
+def prefer_software_opengl():
+    """Use Mesa's software OpenGL (llvmpipe) if FACE_ATTENDANCE_SOFTWARE_GL=1.
+
+    Nothing is detected here; without a working OpenGL context
+    create_video_wall falls back to the QPainter wall instead. Must run
+    before the QApplication is created.
+    """
+    if os.environ.get(SOFTWARE_GL_ENV) == "1":
+        os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+        # On Windows Qt ships Mesa as opengl32sw.dll; elsewhere Mesa honours the variable above
+        QCoreApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+
+
+def opengl_available():
+    """True if an OpenGL context can be created and made current."""
+    context = QOpenGLContext()
+    if not context.create():
+        return False
+    surface = QOffscreenSurface()
+    surface.setFormat(context.format())
+    surface.create()
+    current = surface.isValid() and context.makeCurrent(surface)
+    if current:
+        context.doneCurrent()
+    return current
+
+
+class WallTile:
+    def __init__(self):
+        self.rendered = None  # tile_renderer.RenderedTile; keeps the image's pixels alive
+        self.overlays = []
+        self.text = ""
+
+
+class VideoWallPainting:
+    """Tile layout and painting shared by the OpenGL and software walls.
+
+    Each camera hands in a tile-sized image and its face boxes; the whole
+    wall is then repainted in one pass. Face boxes and labels are drawn as
+    painter geometry on top of the images, not burnt into them.
+    """
+
+    def init_wall(self):
+        self.rows = self.cols = 0
+        self.tiles = []
+        self.setMinimumSize(320, 240)
+
+    def set_grid(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.tiles = [WallTile() for _ in range(rows * cols)]
+        self.update()
+
+    def tile_rect(self, index):
+        if not self.cols or not self.rows:
+            return QRect()
+        width = (self.width() - TILE_GAP * (self.cols - 1)) // self.cols
+        height = (self.height() - TILE_GAP * (self.rows - 1)) // self.rows
+        row, col = divmod(index, self.cols)
+        return QRect(col * (width + TILE_GAP), row * (height + TILE_GAP), max(1, width), max(1, height))
+
+    def set_tile(self, index, rendered, overlays=()):
+        """Show a rendered frame; ``overlays`` are (x, y, w, h, label) in its pixels."""
+        if 0 <= index < len(self.tiles):
+            tile = self.tiles[index]
+            tile.rendered, tile.overlays, tile.text = rendered, overlays, ""
+            self.update()  # Coalesced: every tile changed since the last paint is drawn together
+
+    def set_text(self, index, text):
+        if 0 <= index < len(self.tiles):
+            tile = self.tiles[index]
+            tile.rendered, tile.overlays, tile.text = None, [], text
+            self.update()
+
+    def paint_wall(self, painter):
+        painter.fillRect(self.rect(), BACKGROUND_COLOR)
+        painter.setFont(QFont("", 9))
+        pen = QPen(BOX_COLOR, 2)
+        for index, tile in enumerate(self.tiles):
+            rect = self.tile_rect(index)
+            if tile.rendered is None:
+                painter.setPen(TEXT_COLOR)
+                painter.drawText(rect, Qt.AlignCenter, tile.text)
+                continue
+            image = tile.rendered.image
+            scale = min(rect.width() / image.width(), rect.height() / image.height())
+            width, height = int(image.width() * scale), int(image.height() * scale)
+            target = QRect(rect.x() + (rect.width() - width) // 2, rect.y() + (rect.height() - height) // 2,
+                           width, height)
+            painter.drawImage(target, image)
+            if not tile.overlays:
+                continue
+            painter.setPen(pen)
+            for x, y, w, h, label in tile.overlays:
+                box = QRect(target.x() + int(x * scale), target.y() + int(y * scale), int(w * scale), int(h * scale))
+                painter.drawRect(box)
+                if label:
+                    painter.drawText(box.x(), box.y() - 4, label)
+
+
+class VideoWall(QOpenGLWidget, VideoWallPainting):
+    """Camera grid composited by OpenGL: each frame is uploaded as a texture
+    and all tiles are drawn in one paint pass."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.init_wall()
+
+    def paintGL(self):
+        painter = QPainter(self)
+        self.paint_wall(painter)
+        painter.end()
+
+
+class SoftwareVideoWall(QWidget, VideoWallPainting):
+    """Same wall drawn by the raster engine, for machines without any OpenGL."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.init_wall()
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.paint_wall(painter)
+        painter.end()
+
+
+_opengl = None
+
+
+def create_video_wall(parent=None):
+    """An OpenGL video wall, or the software one where OpenGL cannot be used."""
+    global _opengl
+    if _opengl is None:
+        _opengl = opengl_available()
+        if not _opengl:
+            logging.warning("OpenGL unavailable, drawing the video wall in software")
+    return VideoWall(parent) if _opengl else SoftwareVideoWall(parent)